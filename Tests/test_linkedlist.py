@@ -1,7 +1,18 @@
+from unittest import mock
+
+from src.database.connection_manager import HOSPITAL_DB, manager, transaction
 from src.ds.LinkedList_medication import MedicationHistory
 
-def test_add_medication():
-    med = MedicationHistory()
-    med.add_medication("P001", "Paracetamol", "500mg", "2025-07-10")
-    history = med.show_medication_history("P001")
-    assert any("Paracetamol" in h for h in [x[1] for x in history])
+def test_add_medication(tmp_path):
+    # Work on a scratch database instead of the app's hospital.db
+    with mock.patch.dict(manager.paths, {HOSPITAL_DB: str(tmp_path / "hospital.db")}):
+        try:
+            with transaction(HOSPITAL_DB) as conn:
+                conn.execute("CREATE TABLE medication_history (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                             "patient_id TEXT, med_name TEXT, dosage TEXT, date TEXT)")
+            med = MedicationHistory()
+            med.add_medication("P001", "Paracetamol", "500mg", "2025-07-10")
+            history = med.show_medication_history("P001")
+            assert any("Paracetamol" in h for h in [x[1] for x in history])
+        finally:
+            manager.close()
@@ -1,20 +1,21 @@
 # init_db.py
-from src.database.db_connection import get_connection
+from src.database.connection_manager import HOSPITAL_DB, transaction
 
 def init_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS medication_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            patient_id TEXT,
-            med_name TEXT,
-            dosage TEXT,
-            date TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    with transaction(HOSPITAL_DB) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS medication_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                patient_id TEXT,
+                med_name TEXT,
+                dosage TEXT,
+                date TEXT
+            )
+        ''')
+        # Patient-scoped reads load one patient's rows, already in date order,
+        # without scanning the table
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_medication_patient_date ON medication_history(patient_id, date)")
     print("✅Medication_history table created!")
 
 init_db()
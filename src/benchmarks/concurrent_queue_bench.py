@@ -0,0 +1,82 @@
+# Stress benchmark for the thread-safe queues.
+# Run from the repository root:  python -m src.benchmarks.concurrent_queue_bench
+import argparse
+import threading
+import time
+
+from ..ds.concurrent_queues import BlockingAppointmentQueue, BlockingPriorityQueue, QueueClosed
+
+
+def run(make_queue, put_batch, pop_batch, producers, consumers, items_per_producer, batch):
+    queue = make_queue()
+    served = [0] * consumers
+    start_gate = threading.Barrier(producers + consumers + 1)
+
+    def producer(worker):
+        start_gate.wait()
+        for start in range(0, items_per_producer, batch):
+            count = min(batch, items_per_producer - start)
+            put_batch(queue, worker, start, count)
+
+    def consumer(slot):
+        start_gate.wait()
+        while True:
+            try:
+                served[slot] += len(pop_batch(queue, batch))
+            except QueueClosed:
+                return
+
+    threads = [threading.Thread(target=producer, args=(i,)) for i in range(producers)]
+    threads += [threading.Thread(target=consumer, args=(i,)) for i in range(consumers)]
+    for thread in threads:
+        thread.start()
+    start_gate.wait()
+    began = time.perf_counter()
+    for thread in threads[:producers]:
+        thread.join()
+    queue.close()
+    for thread in threads[producers:]:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    total = producers * items_per_producer
+    assert sum(served) == total, (sum(served), total)
+    return total / elapsed
+
+
+def priority_put(queue, worker, start, count):
+    if count == 1:
+        queue.put(f"W{worker}-{start}", start % 5 + 1)
+    else:
+        queue.put_many((f"W{worker}-{start + i}", (start + i) % 5 + 1) for i in range(count))
+
+
+def appointment_put(queue, worker, start, count):
+    queue.put_many(f"W{worker}-{start + i}" for i in range(count))
+
+
+def pop(queue, batch):
+    return queue.pop_many(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the concurrent patient queues")
+    parser.add_argument("--items", type=int, default=20000, help="patients queued by each producer")
+    parser.add_argument("--maxsize", type=int, default=1000, help="queue bound, 0 for unbounded")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    queues = [
+        ("priority", lambda: BlockingPriorityQueue(args.maxsize), priority_put),
+        ("appointment", lambda: BlockingAppointmentQueue(args.maxsize), appointment_put),
+    ]
+    print(f"{'queue':<12} {'prod':>4} {'cons':>4} {'batch':>5} {'items/s':>12}")
+    for label, make_queue, put_batch in queues:
+        for threads in args.threads:
+            for batch in (1, 32):
+                rate = run(make_queue, put_batch, pop, threads, threads, args.items, batch)
+                print(f"{label:<12} {threads:>4} {threads:>4} {batch:>5} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import time
+
+from .connection_manager import HOSPITAL_DB, transaction
+from .queue_db_connection import get_connection
+
+
+def load_appointments():
+    # Waiting appointments in arrival order, for rebuilding the queue at startup
+    return get_connection().execute("SELECT name, timestamp FROM appointments ORDER BY id").fetchall()
+
+
+class AppointmentWriteBehind:
+    """ Buffers queue changes and writes them to the appointments table in batches.
+
+    Enqueues become INSERTs. Dequeues delete the oldest rows, and a run of
+    them collapses into one DELETE ... LIMIT n. The buffer is flushed in a
+    single transaction once batch_size changes are pending or flush_interval
+    seconds have passed, and on close(). A crash can lose at most the
+    changes made since the last flush.
+    """
+
+    def __init__(self, batch_size=50, flush_interval=2.0, clock=time.monotonic):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._ops = []      # ["enqueue", name, timestamp] or ["dequeue", count]
+        self._pending = 0   # queue changes not yet written
+        self._last_flush = clock()
+        self.flushes = 0
+
+    def __len__(self):
+        return self._pending
+
+    def record_enqueue(self, name, timestamp):
+        self._ops.append(["enqueue", name, timestamp])
+        self._pending += 1
+        self.flush_if_due()
+
+    def record_dequeue(self):
+        if self._ops and self._ops[-1][0] == "dequeue":
+            self._ops[-1][1] += 1
+        else:
+            self._ops.append(["dequeue", 1])
+        self._pending += 1
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        if self._pending >= self.batch_size or (
+                self._pending and self.clock() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """ Write every buffered change in one transaction; returns how many were written """
+        if not self._ops:
+            return 0
+        # Any failure rolls the whole batch back and keeps the buffer, so the
+        # next flush retries it
+        with transaction(HOSPITAL_DB) as conn:
+            i = 0
+            while i < len(self._ops):
+                if self._ops[i][0] == "dequeue":
+                    conn.execute("DELETE FROM appointments WHERE id IN "
+                                   "(SELECT id FROM appointments ORDER BY id LIMIT ?)", (self._ops[i][1],))
+                    i += 1
+                    continue
+                # Consecutive enqueues go in with one executemany
+                start = i
+                while i < len(self._ops) and self._ops[i][0] == "enqueue":
+                    i += 1
+                conn.executemany("INSERT INTO appointments (name, timestamp) VALUES (?, ?)",
+                                   [(op[1], op[2]) for op in self._ops[start:i]])
+
+        written = self._pending
+        self._ops = []
+        self._pending = 0
+        self._last_flush = self.clock()
+        self.flushes += 1
+        return written
+
+    def close(self):
+        return self.flush()
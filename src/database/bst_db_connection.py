@@ -1,52 +1,38 @@
-# src/database/db_connection.py
+# src/database/bst_db_connection.py
 #by Michelle
 import sqlite3
 
-DB_NAME = "doctors.db"
+from .connection_manager import DOCTORS_DB, manager, transaction
+
+DB_NAME = DOCTORS_DB
 
 def get_connection():
-    return sqlite3.connect(DB_NAME)
+    return manager.connection(DB_NAME)
 
 def initialize_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS doctors (
-            name TEXT PRIMARY KEY,
-            specialty TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
+    with transaction(DB_NAME) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS doctors (
+                name TEXT PRIMARY KEY,
+                specialty TEXT
+            )
+        """)
 
 def insert_doctor_db(name, specialty):
-    conn = get_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute("INSERT INTO doctors (name, specialty) VALUES (?, ?)", (name, specialty))
-        conn.commit()
+        with transaction(DB_NAME) as conn:
+            conn.execute("INSERT INTO doctors (name, specialty) VALUES (?, ?)", (name, specialty))
     except sqlite3.IntegrityError:
         pass
-    conn.close()
 
 def update_doctor_db(name, specialty):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE doctors SET specialty = ? WHERE name = ?", (specialty, name))
-    conn.commit()
-    conn.close()
+    with transaction(DB_NAME) as conn:
+        conn.execute("UPDATE doctors SET specialty = ? WHERE name = ?", (specialty, name))
 
 def delete_doctor_db(name):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM doctors WHERE name = ?", (name,))
-    conn.commit()
-    conn.close()
+    with transaction(DB_NAME) as conn:
+        conn.execute("DELETE FROM doctors WHERE name = ?", (name,))
 
 def fetch_all_doctors():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT name, specialty FROM doctors")
-    data = cursor.fetchall()
-    conn.close()
-    return data
+    # name is the primary key, so ordering by it reads the index instead of sorting
+    return get_connection().execute("SELECT name, specialty FROM doctors ORDER BY name").fetchall()
@@ -0,0 +1,130 @@
+# connection_manager.py
+# One place that opens SQLite connections for every DAO. Connections are kept
+# open per thread and per database file instead of being opened and closed
+# around each statement.
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Database files live in the repository root, wherever the app is started from
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+HOSPITAL_DB = "hospital.db"                     # patients, medication_history, appointments
+DOCTORS_DB = "doctors.db"                       # doctors
+PRIORITY_QUEUE_DB = "priorityQueue_patients.db"  # triage patients and sequences
+
+
+class ConnectionManager:
+    """ Per-thread pool of tuned SQLite connections, keyed by database file.
+
+    Every connection runs in WAL mode with synchronous=NORMAL, so a commit
+    appends to the log instead of syncing the main file, and readers do not
+    block the writer. The connection's statement cache is raised so repeated
+    DAO queries skip re-preparing. Connections are opened in autocommit mode
+    and transaction() supplies BEGIN/COMMIT, nesting as savepoints.
+    """
+
+    CACHED_STATEMENTS = 256
+    PRAGMAS = (
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("cache_size", -16000),         # KiB, i.e. about 16 MB of page cache
+        ("mmap_size", 64 * 1024 * 1024),
+        ("temp_store", "MEMORY"),
+        ("busy_timeout", 5000),
+    )
+
+    def __init__(self, root_dir=ROOT_DIR):
+        self.root_dir = root_dir
+        self.paths = {}  # name -> path overrides, e.g. a scratch file in tests
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._opened = []  # every connection handed out, for close_all()
+
+    def db_path(self, name=HOSPITAL_DB):
+        path = self.paths.get(name, name)
+        if path == ":memory:":
+            return path
+        return os.path.abspath(os.path.join(self.root_dir, path))
+
+    def _pool(self):
+        pool = getattr(self._local, "connections", None)
+        if pool is None:
+            pool = self._local.connections = {}
+            self._local.depths = {}
+        return pool
+
+    def _open(self, path):
+        conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False,
+                               cached_statements=self.CACHED_STATEMENTS)
+        for pragma, value in self.PRAGMAS:
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        with self._lock:
+            self._opened.append(conn)
+        return conn
+
+    def connection(self, name=HOSPITAL_DB):
+        """ This thread's connection to the named database, reopened if it was closed """
+        path = self.db_path(name)
+        pool = self._pool()
+        conn = pool.get(path)
+        if conn is not None:
+            try:
+                conn.total_changes  # raises ProgrammingError once closed
+                return conn
+            except sqlite3.ProgrammingError:
+                self._local.depths.pop(path, None)
+        conn = pool[path] = self._open(path)
+        return conn
+
+    @contextmanager
+    def transaction(self, name=HOSPITAL_DB):
+        """ Commit everything in the block together, or roll it all back.
+
+        The outermost block runs BEGIN/COMMIT. Nested blocks on the same
+        database become savepoints, so an inner failure only undoes the
+        inner block.
+        """
+        conn = self.connection(name)
+        path = self.db_path(name)
+        depths = self._local.depths
+        depth = depths.get(path, 0)
+        savepoint = f"sp_{depth}"
+        conn.execute("BEGIN" if depth == 0 else f"SAVEPOINT {savepoint}")
+        depths[path] = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0:
+                conn.execute("ROLLBACK")
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            conn.execute("COMMIT" if depth == 0 else f"RELEASE {savepoint}")
+        finally:
+            depths[path] = depth
+
+    def close(self):
+        """ Close this thread's connections """
+        pool = self._pool()
+        with self._lock:
+            self._opened = [conn for conn in self._opened if conn not in pool.values()]
+        for conn in pool.values():
+            conn.close()
+        pool.clear()
+        self._local.depths.clear()
+
+    def close_all(self):
+        """ Close every connection handed out, from any thread; used at shutdown """
+        with self._lock:
+            opened, self._opened = self._opened, []
+        for conn in opened:
+            conn.close()
+
+
+manager = ConnectionManager()
+get_connection = manager.connection
+transaction = manager.transaction
@@ -1,28 +1,20 @@
-import sqlite3
-import os
-regNo_P191231_LinkedList
-def get_connection():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.join(base_dir, "../../hospital.db")
-    return sqlite3.connect(os.path.abspath(db_path))
-  
-DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "hospital.db"))
+from .connection_manager import HOSPITAL_DB, manager, transaction
 
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
 
-def init_db():
+def get_connection():
+    return manager.connection(HOSPITAL_DB)
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS patients (
-            id TEXT PRIMARY KEY,
-            name TEXT,
-            age INTEGER,
-            condition TEXT
-        )
-    """)
 
-    conn.commit()
+def init_db():
+    with transaction(HOSPITAL_DB) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS patients (
+                id TEXT PRIMARY KEY,
+                name TEXT,
+                age INTEGER,
+                condition TEXT
+            )
+        """)
 
 
 def insert_patient_to_db(patient):
@@ -30,19 +22,34 @@ def insert_patient_to_db(patient):
         INSERT OR REPLACE INTO patients (id, name, age, condition)
         VALUES (?, ?, ?, ?)
     """
-    cursor.execute(sql, (patient.id, patient.name, patient.age, patient.condition))
-    conn.commit()
+    with transaction(HOSPITAL_DB) as conn:
+        conn.execute(sql, (patient.id, patient.name, patient.age, patient.condition))
 
 
 def delete_patient_from_db(patient_id):
     sql = """
         DELETE FROM patients WHERE id = ?
     """
-    cursor.execute(sql, (patient_id, ))
-    conn.commit()
+    with transaction(HOSPITAL_DB) as conn:
+        conn.execute(sql, (patient_id, ))
 
 
 def get_all_patients():
-    cursor.execute("SELECT id, name, age, condition FROM patients")
-    return cursor.fetchall()
-  main
+    return get_connection().execute("SELECT id, name, age, condition FROM patients").fetchall()
+
+
+def count_patients():
+    return get_connection().execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+
+
+def iter_patients(chunk_size=1000):
+    # Streams rows in chunks instead of materialising the whole table with
+    # fetchall(). Uses its own cursor so other queries can run meanwhile.
+    stream = get_connection().cursor()
+    stream.execute("SELECT id, name, age, condition FROM patients")
+    while True:
+        rows = stream.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield from rows
+    stream.close()
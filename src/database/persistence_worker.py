@@ -0,0 +1,153 @@
+# persistence_worker.py
+# Runs database writes on a background thread so Tk handlers never wait on a
+# commit. Results come back to the Tk thread through root.after().
+import logging
+import queue
+import threading
+from collections import deque
+
+from .connection_manager import manager, transaction
+
+
+class _Job:
+    __slots__ = ("db", "fn", "args", "on_done", "on_error")
+
+    def __init__(self, db, fn, args, on_done, on_error):
+        self.db = db
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+
+
+class PersistenceWorker:
+    """ Background writer with a bounded queue and group commit.
+
+    submit() queues a DAO call and returns at once. The worker takes every
+    job that is waiting (up to batch_size) and runs the ones for the same
+    database inside one transaction, each in its own savepoint. One commit
+    then covers the whole group, and a failing job only undoes itself. Jobs
+    for one database run in the order they were submitted.
+
+    on_done(result) / on_error(exc) callbacks are collected and run by poll()
+    on the caller's thread; attach(root) polls from the Tk event loop.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, maxsize=1000, batch_size=100, on_error=None):
+        self.batch_size = batch_size
+        self.on_error = on_error or (lambda exc: logging.error(f"Background write failed: {exc}"))
+        self._jobs = queue.Queue(maxsize)
+        self._completed = deque()  # (callback, value), appended by the worker thread
+        self._closed = False
+        self.submitted = 0
+        self.committed = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+        self._thread = threading.Thread(target=self._run, name="persistence-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, db, fn, *args, on_done=None, on_error=None, timeout=None):
+        """ Queue fn(*args) to run against db. Blocks (up to timeout) only while the queue is full """
+        if self._closed:
+            raise RuntimeError("PersistenceWorker has been shut down")
+        self._jobs.put(_Job(db, fn, args, on_done, on_error), timeout=timeout)
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, self.depth())
+
+    def depth(self):
+        """ Jobs queued or being written right now """
+        # unfinished_tasks counts a job from put() until its task_done(), so
+        # one the worker has taken but not yet committed still shows up
+        return self._jobs.unfinished_tasks
+
+    def stats(self):
+        return {"depth": self.depth(), "max_depth": self.max_depth, "submitted": self.submitted,
+                "committed": self.committed, "failed": self.failed, "batches": self.batches}
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                break
+            batch = [job]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+
+            groups = {}
+            for job in batch:
+                groups.setdefault(job.db, []).append(job)
+            for db, jobs in groups.items():
+                self._commit_group(db, jobs)
+            self.batches += 1
+
+            for _ in batch:
+                self._jobs.task_done()
+            if stop:
+                self._jobs.task_done()
+                break
+        manager.close()
+
+    def _commit_group(self, db, jobs):
+        outcomes = []
+        try:
+            with transaction(db):
+                for job in jobs:
+                    try:
+                        with transaction(db):
+                            outcomes.append((job, True, job.fn(*job.args)))
+                    except Exception as exc:
+                        outcomes.append((job, False, exc))
+        except Exception as exc:
+            # The commit itself failed, so nothing in the group was written
+            outcomes = [(job, False, exc) for job in jobs]
+
+        for job, ok, value in outcomes:
+            if ok:
+                self.committed += 1
+                if job.on_done:
+                    self._completed.append((job.on_done, value))
+            else:
+                self.failed += 1
+                self._completed.append((job.on_error or self.on_error, value))
+
+    def poll(self):
+        """ Run the callbacks of finished jobs on this thread; returns how many ran """
+        ran = 0
+        while self._completed:
+            callback, value = self._completed.popleft()
+            callback(value)
+            ran += 1
+        return ran
+
+    def attach(self, root, interval_ms=POLL_MS):
+        """ Deliver callbacks on the Tk thread every interval_ms """
+        def tick():
+            self.poll()
+            if not self._closed:
+                root.after(interval_ms, tick)
+        root.after(interval_ms, tick)
+
+    def flush(self):
+        """ Wait until every job submitted so far has been committed (or failed) """
+        self._jobs.join()
+
+    def shutdown(self):
+        """ Write out everything still queued, deliver the callbacks and stop the thread """
+        if self._closed:
+            return
+        self._closed = True
+        self._jobs.put(None)
+        self._thread.join()
+        self.poll()
@@ -1,38 +1,69 @@
-from .priorityQueue_db_config import get_connection
+import threading
 
-arrival_counter = 0
+from .connection_manager import transaction
+from .priorityQueue_db_config import DB_NAME, get_connection
 
-def add_patient_to_db(name, priority):
-    global arrival_counter
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO patients (name, priority, arrival_order) VALUES (?, ?, ?)",
-                   (name, priority, arrival_counter))
-    arrival_counter += 1
-    conn.commit()
-    conn.close()
+def reserve_arrival_block(size):
+    """ Atomically claim `size` arrival numbers and return them as (start, end) """
+    with transaction(DB_NAME) as conn:
+        # The UPDATE takes the write lock, so the read below sees our own increment
+        # and no other process can claim the same numbers before we commit
+        conn.execute("UPDATE sequences SET next_value = next_value + ? WHERE name = 'arrival_order'", (size,))
+        end = conn.execute("SELECT next_value FROM sequences WHERE name = 'arrival_order'").fetchone()[0]
+    return end - size, end
 
-def get_all_patients():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT name, priority, arrival_order FROM patients ORDER BY priority ASC, arrival_order ASC")
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
 
-import sqlite3
+class ArrivalSequence:
+    """ Monotonic arrival numbers shared by every process using the database.
 
-def delete_all_patients():
-    conn = sqlite3.connect("patients.db")  # use your correct DB path if different
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM patients")
-    conn.commit()
-    conn.close()
+    Numbers are reserved block_size at a time, so only one arrival in
+    block_size writes to the sequences table. Within a process numbers are
+    strictly increasing; across processes they can be out of step by up to one
+    block, so use block_size=1 when stations must tie-break exactly.
+    """
 
-def delete_all_patients():
-    conn = sqlite3.connect("patients.db")  # use your correct DB path if different
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM patients")
-    conn.commit()
-    conn.close()
+    def __init__(self, block_size=32):
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = reserve_arrival_block(self.block_size)
+            value = self._next
+            self._next += 1
+            return value
+
+
+# Shared by the DAO and the in-memory queue so both agree on arrival order.
+# Stations tie-break equal priorities by this number, so it claims one at a
+# time; bulk loaders can use their own ArrivalSequence with a larger block.
+arrival_sequence = ArrivalSequence(block_size=1)
 
+def add_patient_to_db(name, priority, arrival_order=None, arrival_time=None):
+    # Callers that own a PriorityQueue pass the handle it returned as arrival_order
+    if arrival_order is None:
+        arrival_order = arrival_sequence.next()
+    with transaction(DB_NAME) as conn:
+        conn.execute("INSERT INTO patients (name, priority, arrival_order, arrival_time) VALUES (?, ?, ?, ?)",
+                     (name, priority, arrival_order, arrival_time))
+
+def remove_patient_from_db(arrival_order):
+    # Called once a patient is served or leaves, so a restart does not bring them back
+    with transaction(DB_NAME) as conn:
+        removed = conn.execute("DELETE FROM patients WHERE arrival_order = ?", (arrival_order,)).rowcount
+    return removed > 0
+
+def update_patient_priority_db(arrival_order, priority):
+    with transaction(DB_NAME) as conn:
+        conn.execute("UPDATE patients SET priority = ? WHERE arrival_order = ?", (priority, arrival_order))
+
+def get_all_patients():
+    return get_connection().execute("SELECT name, priority, arrival_order, arrival_time FROM patients "
+                                    "ORDER BY priority ASC, arrival_order ASC").fetchall()
+
+def delete_all_patients():
+    with transaction(DB_NAME) as conn:
+        conn.execute("DELETE FROM patients")
@@ -1,19 +1,47 @@
-import sqlite3
+from .connection_manager import PRIORITY_QUEUE_DB, manager, transaction
+
+DB_NAME = PRIORITY_QUEUE_DB
 
 def get_connection():
-    conn = sqlite3.connect("priorityQueue_patients.db")
-    return conn
+    return manager.connection(DB_NAME)
 
 def initialize_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS patients (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            priority INTEGER NOT NULL,
-            arrival_order INTEGER NOT NULL
-        )
-    """)
-    conn.commit()
-    conn.close()
+    with transaction(DB_NAME) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS patients (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                arrival_order INTEGER NOT NULL
+            )
+        """)
+
+        # Older databases have no arrival_time column
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(patients)")]
+        if "arrival_time" not in columns:
+            cursor.execute("ALTER TABLE patients ADD COLUMN arrival_time TEXT")
+
+        # arrival_order used to restart at 0 on every launch. The id column holds
+        # the real arrival sequence, so renumber once if the orders collide.
+        cursor.execute("SELECT COUNT(*) - COUNT(DISTINCT arrival_order) FROM patients")
+        if cursor.fetchone()[0]:
+            cursor.execute("UPDATE patients SET arrival_order = id")
+
+        # Arrival numbers are handed out in blocks from this table, see ArrivalSequence.
+        # Never let the sequence fall behind rows written by older versions.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sequences (
+                name TEXT PRIMARY KEY,
+                next_value INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO sequences (name, next_value) VALUES ('arrival_order', 0)")
+        cursor.execute("""
+            UPDATE sequences
+            SET next_value = MAX(next_value, (SELECT COALESCE(MAX(arrival_order) + 1, 0) FROM patients))
+            WHERE name = 'arrival_order'
+        """)
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_patients_queue ON patients (priority, arrival_order)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_patients_arrival ON patients (arrival_order)")
@@ -1,5 +1,5 @@
-import sqlite3
+from .connection_manager import HOSPITAL_DB, manager
+
 
 def get_connection():
-    conn = sqlite3.connect('hospital.db')
-    return conn
\ No newline at end of file
+    return manager.connection(HOSPITAL_DB)
@@ -1,16 +1,11 @@
-from database.queue_db_connection import get_connection
+from .connection_manager import HOSPITAL_DB, transaction
 
 def create_tables():
-    conn = get_connection()
-    cursor = conn.cursor()
-
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS appointments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-    )
-                   """)
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    with transaction(HOSPITAL_DB) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS appointments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+                       """)
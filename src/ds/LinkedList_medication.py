@@ -1,74 +1,245 @@
+import datetime
+import struct
+import sys
+from bisect import bisect_left, bisect_right
+
+from src.database.connection_manager import HOSPITAL_DB, transaction
 from src.database.db_connection import get_connection
+from src.ds.lru_cache import LRUCache
 
 class MedicationNode:
+    __slots__ = ("med_name", "dosage", "date", "next")
+
     def __init__(self, med_name, dosage, date):
         self.med_name = med_name
         self.dosage = dosage
         self.date = date
         self.next = None
 
-class MedicationHistory:
+# The date picker writes ISO dates (tried first); these cover rows typed by hand
+DATE_FORMATS = ("%m/%d/%y", "%m/%d/%Y", "%d-%m-%Y")
+
+def date_ordinal(value):
+    # Day number used to keep a patient's doses in date order. Dates that
+    # cannot be parsed get 0, so they sort first instead of being dropped.
+    if isinstance(value, datetime.datetime):
+        return value.date().toordinal()
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    try:
+        return datetime.date.fromisoformat(value.strip()).toordinal()
+    except (AttributeError, TypeError, ValueError):
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value.strip(), date_format).toordinal()
+        except ValueError:
+            continue
+    return 0
+
+# Each dose takes a slot in ordinals, nodes and its medication's two lists
+SLOT_BYTES = 4 * struct.calcsize("P")
+# A medication's by_name entry: its (ordinals, nodes) pair of lists
+NAME_BYTES = sys.getsizeof(([], [])) + 2 * sys.getsizeof([])
+
+def node_bytes(node, ordinal):
+    # Rough memory held by one dose for the cache budget: the node, its
+    # strings, its ordinal and its slots in the index lists
+    return (sys.getsizeof(node) + sys.getsizeof(node.med_name) + sys.getsizeof(node.dosage) +
+            sys.getsizeof(node.date) + sys.getsizeof(ordinal) + SLOT_BYTES)
+
+class PatientMedications:
+    # One patient's linked list, kept in date order. ordinals/nodes are a
+    # parallel sorted array over the same nodes, so bisect finds where a dose
+    # goes (or where a date range starts) in O(log n); by_name does the same
+    # per medication for "latest dose of X". Doses on the same date keep the
+    # order they were added.
+    __slots__ = ("head", "tail", "count", "nbytes", "ordinals", "nodes", "by_name")
+
     def __init__(self):
         self.head = None
+        self.tail = None
+        self.count = 0
+        self.nbytes = sys.getsizeof(self)
+        self.ordinals = []
+        self.nodes = []
+        self.by_name = {}  # med_name -> (ordinals, nodes)
 
-    def add_medication(self, patient_id, med_name, dosage, date):
-        new_node = MedicationNode(med_name, dosage, date)
-        if self.head is None:
-            self.head = new_node
+    def insert(self, node):
+        ordinal = date_ordinal(node.date)
+        i = bisect_right(self.ordinals, ordinal)
+        if i == 0:
+            node.next = self.head
+            self.head = node
         else:
-            temp = self.head
-            while temp.next:
-                temp = temp.next
-            temp.next = new_node
-
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO medication_history(patient_id, med_name, dosage, date) VALUES (?, ?, ?, ?)",
-                       (patient_id, med_name, dosage, date))
-        conn.commit()
-        conn.close()
-        print(f"[LOG] Medication added for {patient_id}: {med_name}")
+            node.next = self.nodes[i - 1].next
+            self.nodes[i - 1].next = node
+        if node.next is None:
+            self.tail = node
+        # Rows usually arrive in date order, which makes these appends
+        self.ordinals.insert(i, ordinal)
+        self.nodes.insert(i, node)
 
-    def delete_medication(self, patient_id, med_name):
-        previous_node = None
+        if node.med_name not in self.by_name:
+            self.by_name[node.med_name] = ([], [])
+            self.nbytes += NAME_BYTES
+        ordinals, nodes = self.by_name[node.med_name]
+        j = bisect_right(ordinals, ordinal)
+        ordinals.insert(j, ordinal)
+        nodes.insert(j, node)
+
+        self.count += 1
+        self.nbytes += node_bytes(node, ordinal)
+
+    def remove_all(self, med_name):
+        # Unlink every node for med_name, like the DELETE does; returns how many went
+        removed_ordinals, removed = self.by_name.pop(med_name, ([], []))
+        if not removed:
+            return 0
+        kept = [i for i, node in enumerate(self.nodes) if node.med_name != med_name]
+        self.ordinals = [self.ordinals[i] for i in kept]
+        self.nodes = [self.nodes[i] for i in kept]
+        for node, following in zip(self.nodes, self.nodes[1:] + [None]):
+            node.next = following
+        self.head = self.nodes[0] if self.nodes else None
+        self.tail = self.nodes[-1] if self.nodes else None
+        self.count -= len(removed)
+        self.nbytes -= NAME_BYTES + sum(node_bytes(node, ordinal)
+                                        for node, ordinal in zip(removed, removed_ordinals))
+        return len(removed)
+
+    def between(self, start, end):
+        """ Nodes dated from start to end inclusive, in date order """
+        lo = bisect_left(self.ordinals, date_ordinal(start))
+        hi = bisect_right(self.ordinals, date_ordinal(end))
+        return self.nodes[lo:hi]
+
+    def latest(self, med_name, on_or_before=None):
+        ordinals, nodes = self.by_name.get(med_name, ([], []))
+        i = len(nodes) if on_or_before is None else bisect_right(ordinals, date_ordinal(on_or_before))
+        return nodes[i - 1] if i else None
+
+    def __iter__(self):
         current_node = self.head
         while current_node:
-            if current_node.med_name == med_name:
-                if previous_node:
-                    previous_node.next = current_node.next
-                else:
-                    self.head = current_node.next
-                break
-            previous_node = current_node
+            yield current_node
             current_node = current_node.next
 
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM medication_history WHERE patient_id = ? AND med_name=?",
-                       (patient_id, med_name))
-        conn.commit()
-        conn.close()
-        print(f"[LOG] Medication '{med_name}' deleted for {patient_id}")
+def insert_medication_row(patient_id, med_name, dosage, date):
+    with transaction(HOSPITAL_DB) as conn:
+        conn.execute("INSERT INTO medication_history(patient_id, med_name, dosage, date) VALUES (?, ?, ?, ?)",
+                     (patient_id, med_name, dosage, date))
 
-    def show_medication_history(self, patient_id=None):
-        conn = get_connection()
-        cursor = conn.cursor()
+class MedicationHistory:
+    # Medication lists partitioned by patient, in a read-through LRU cache in
+    # front of medication_history. A patient's list is read from the table on
+    # a miss and kept in step by add/delete while it stays cached, so every
+    # patient-scoped operation only touches that patient's rows.
+    # With a PersistenceWorker as writer, adds are committed in the background;
+    # table reads and deletes wait for queued adds first so they see them.
 
-        if patient_id:
-            cursor.execute("SELECT patient_id, med_name, dosage, date FROM medication_history WHERE patient_id = ?",
-                           (patient_id,))
+    MAX_PATIENTS = 500
+    MAX_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, max_patients=MAX_PATIENTS, max_bytes=MAX_BYTES, writer=None):
+        # patient_id -> PatientMedications
+        self.patients = LRUCache(max_patients, max_bytes, sizeof=lambda history: history.nbytes)
+        self.writer = writer
+
+    def _settle(self):
+        if self.writer is not None:
+            self.writer.flush()  # returns at once when nothing is pending
+
+    def _history(self, patient_id):
+        history = self.patients.get(patient_id)
+        if history is None:
+            self._settle()
+            history = PatientMedications()
+            # ORDER BY date is only a hint: it compares the stored text, so it
+            # matches date order for ISO dates but not for hand-typed formats.
+            # insert() places every row by its parsed date either way; the
+            # hint just turns the common case into appends.
+            cursor = get_connection().execute(
+                "SELECT med_name, dosage, date FROM medication_history WHERE patient_id = ? ORDER BY date, id",
+                (patient_id,))
+            for med_name, dosage, date in cursor:
+                history.insert(MedicationNode(med_name, dosage, date))
+            self.patients.put(patient_id, history)
+        return history
+
+    def _cached(self, patient_id):
+        # Write-through target for add/delete: the cached list, if there is one
+        return self.patients.peek(patient_id)
+
+    def invalidate(self, patient_id=None):
+        """ Drop one patient's cached list (or all of them) after outside changes to the table """
+        if patient_id is None:
+            self.patients.clear()
+        else:
+            self.patients.invalidate(patient_id)
+
+    def cache_stats(self):
+        return self.patients.stats()
+
+    def add_medication(self, patient_id, med_name, dosage, date):
+        if self.writer is None:
+            insert_medication_row(patient_id, med_name, dosage, date)
         else:
-            cursor.execute("SELECT patient_id, med_name, dosage, date FROM medication_history")
+            self.writer.submit(HOSPITAL_DB, insert_medication_row, patient_id, med_name, dosage, date,
+                               on_error=lambda exc: self._add_failed(patient_id, exc))
+
+        # A patient that is not cached picks the row up on the next read
+        history = self._cached(patient_id)
+        if history is not None:
+            history.insert(MedicationNode(med_name, dosage, date))
+            self.patients.put(patient_id, history)  # re-weigh against the byte budget
+        print(f"[LOG] Medication added for {patient_id}: {med_name}")
 
-        rows = cursor.fetchall()
-        conn.close()
+    def _add_failed(self, patient_id, exc):
+        # The cached list already shows the dose; reload it from the table
+        self.invalidate(patient_id)
+        self.writer.on_error(exc)
 
+    def delete_medication(self, patient_id, med_name):
+        self._settle()
+        with transaction(HOSPITAL_DB) as conn:
+            deleted = conn.execute("DELETE FROM medication_history WHERE patient_id = ? AND med_name=?",
+                                   (patient_id, med_name)).rowcount
+
+        history = self._cached(patient_id)
+        if history is not None:
+            history.remove_all(med_name)
+            self.patients.put(patient_id, history)
+        print(f"[LOG] Medication '{med_name}' deleted for {patient_id}")
+        return deleted
+
+    def medications(self, patient_id):
+        """ (med_name, dosage, date) for one patient, oldest first """
+        return [(node.med_name, node.dosage, node.date) for node in self._history(patient_id)]
+
+    def medications_between(self, patient_id, start, end):
+        """ Doses dated from start to end inclusive, e.g. what the patient was on in a given week """
+        return [(node.med_name, node.dosage, node.date)
+                for node in self._history(patient_id).between(start, end)]
+
+    def latest_dose(self, patient_id, med_name, on_or_before=None):
+        """ Most recent (med_name, dosage, date) of one medication, or None """
+        node = self._history(patient_id).latest(med_name, on_or_before)
+        return None if node is None else (node.med_name, node.dosage, node.date)
+
+    def count(self, patient_id):
+        return self._history(patient_id).count
+
+    def show_medication_history(self, patient_id=None):
         if patient_id:
+            rows = [(patient_id,) + medication for medication in self.medications(patient_id)]
             print(f"[LOG] Medication History for {patient_id}:")
         else:
+            self._settle()
+            rows = get_connection().execute(
+                "SELECT patient_id, med_name, dosage, date FROM medication_history").fetchall()
             print(f"[LOG] Full Medication History:")
 
         for row in rows:
             print(f" - Patient: {row[0]}, {row[1]} ({row[2]}) on {row[3]}")
         return rows
-
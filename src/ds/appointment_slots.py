@@ -0,0 +1,192 @@
+# appointment_slots.py
+# Books appointments into time slots per doctor, next to the walk-in FIFO in
+# queue_appointments.
+import datetime
+import heapq
+import itertools
+import math
+from bisect import bisect_left, bisect_right
+
+from .queue_appointments import TIMESTAMP_FORMAT
+
+
+def to_datetime(value):
+    """ Accept a datetime or a timestamp string in the format the UI records """
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+class Booking:
+    __slots__ = ("doctor", "patient", "start", "end", "seq")
+
+    def __init__(self, doctor, patient, start, end, seq):
+        self.doctor = doctor
+        self.patient = patient
+        self.start = start
+        self.end = end
+        self.seq = seq  # tie-break for bookings with the same start
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return (f"Booking({self.doctor!r}, {self.patient!r}, "
+                f"{self.start.strftime(TIMESTAMP_FORMAT)} - {self.end.strftime('%H:%M')})")
+
+
+class SlotScheduler:
+    """ Appointment slots kept in sorted arrays and searched with bisect.
+
+    Each doctor's bookings never overlap, so one list sorted by start is also
+    sorted by end, and finding a doctor's bookings or free gaps costs
+    O(log n + k). Hospital-wide, bookings are grouped by length, each group
+    sorted by start. Within a group of length d, the bookings overlapping
+    [a, b) are exactly those starting after a - d and before b, so "who is
+    booked between" is two bisects per group and never scans a booking
+    outside the window. Lengths come in slot multiples, so groups are few.
+    """
+
+    SLOT_MINUTES = 15
+
+    def __init__(self, slot_minutes=SLOT_MINUTES):
+        self.slot = datetime.timedelta(minutes=slot_minutes)
+        self._doctor_starts = {}    # doctor -> sorted start times
+        self._doctor_bookings = {}  # doctor -> bookings, parallel to the starts
+        self._by_duration = {}      # duration -> (sorted (start, seq) keys, bookings in that order)
+        self._count = 0
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return self._count
+
+    def _duration(self, duration):
+        if duration is None:
+            return self.slot
+        if not isinstance(duration, datetime.timedelta):
+            duration = datetime.timedelta(minutes=duration)
+        if duration <= datetime.timedelta(0):
+            raise ValueError("Appointment duration must be positive")
+        return duration
+
+    def _align(self, moment):
+        # Round up to the next slot boundary, counted from midnight
+        midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        slots, remainder = divmod(moment - midnight, self.slot)
+        if remainder:
+            slots += 1
+        return midnight + slots * self.slot
+
+    def _conflict(self, doctor, start, end):
+        # The only candidates are the booking just before start and the one at or after it
+        starts = self._doctor_starts.get(doctor, [])
+        bookings = self._doctor_bookings.get(doctor, [])
+        i = bisect_left(starts, start)
+        if i > 0 and bookings[i - 1].end > start:
+            return bookings[i - 1]
+        if i < len(starts) and starts[i] < end:
+            return bookings[i]
+        return None
+
+    def is_free(self, doctor, start, duration=None):
+        start = to_datetime(start)
+        return self._conflict(doctor, start, start + self._duration(duration)) is None
+
+    def book(self, doctor, patient, start, duration=None):
+        """ Book [start, start + duration); raises ValueError if the doctor is busy """
+        start = to_datetime(start)
+        end = start + self._duration(duration)
+        clash = self._conflict(doctor, start, end)
+        if clash is not None:
+            raise ValueError(f"{doctor} is already booked with {clash.patient} at "
+                             f"{clash.start.strftime(TIMESTAMP_FORMAT)}")
+
+        booking = Booking(doctor, patient, start, end, next(self._seq))
+        starts = self._doctor_starts.setdefault(doctor, [])
+        i = bisect_left(starts, start)
+        starts.insert(i, start)
+        self._doctor_bookings.setdefault(doctor, []).insert(i, booking)
+
+        keys, same_length = self._by_duration.setdefault(booking.duration, ([], []))
+        key = (start, booking.seq)
+        i = bisect_left(keys, key)
+        keys.insert(i, key)
+        same_length.insert(i, booking)
+        self._count += 1
+        return booking
+
+    def schedule(self, doctor, patient, arrived, duration=None):
+        """ Book the doctor's first free slot at or after a patient's arrival time """
+        start = self.next_free_slot(doctor, arrived, duration)
+        return self.book(doctor, patient, start, duration)
+
+    def cancel(self, booking):
+        starts = self._doctor_starts.get(booking.doctor, [])
+        i = bisect_left(starts, booking.start)
+        if i == len(starts) or self._doctor_bookings[booking.doctor][i] is not booking:
+            return False
+        del starts[i]
+        del self._doctor_bookings[booking.doctor][i]
+
+        keys, same_length = self._by_duration[booking.duration]
+        i = bisect_left(keys, (booking.start, booking.seq))
+        del keys[i]
+        del same_length[i]
+        if not keys:
+            del self._by_duration[booking.duration]
+        self._count -= 1
+        return True
+
+    def next_free_slot(self, doctor, after, duration=None, until=None):
+        """ Earliest slot-aligned start >= after with room for duration, or None past until """
+        length = self._duration(duration)
+        candidate = self._align(to_datetime(after))
+        until = to_datetime(until) if until is not None else None
+        starts = self._doctor_starts.get(doctor, [])
+        bookings = self._doctor_bookings.get(doctor, [])
+
+        i = bisect_right(starts, candidate)
+        if i > 0 and bookings[i - 1].end > candidate:
+            candidate = self._align(bookings[i - 1].end)
+        # Walk forward through the gaps until one is long enough
+        while i < len(bookings) and bookings[i].start < candidate + length:
+            if bookings[i].end > candidate:
+                candidate = self._align(bookings[i].end)
+            i += 1
+
+        if until is not None and candidate + length > until:
+            return None
+        return candidate
+
+    def bookings_for(self, doctor, start=None, end=None):
+        """ A doctor's bookings overlapping [start, end), in time order """
+        starts = self._doctor_starts.get(doctor, [])
+        bookings = self._doctor_bookings.get(doctor, [])
+        lo = 0
+        if start is not None:
+            start = to_datetime(start)
+            lo = bisect_right(starts, start)
+            if lo > 0 and bookings[lo - 1].end > start:
+                lo -= 1
+        hi = len(starts) if end is None else bisect_left(starts, to_datetime(end))
+        return bookings[lo:hi]
+
+    def booked_between(self, start, end):
+        """ Every booking overlapping [start, end), ordered by start time """
+        start, end = to_datetime(start), to_datetime(end)
+        runs = []
+        for duration, (keys, same_length) in self._by_duration.items():
+            # Starting after start - duration is the same as ending after start
+            lo = bisect_right(keys, (start - duration, math.inf))
+            hi = bisect_left(keys, (end,))
+            if lo < hi:
+                runs.append(same_length[lo:hi])
+        return list(heapq.merge(*runs, key=lambda booking: (booking.start, booking.seq)))
+
+    def doctors_free(self, start, duration=None, doctors=None):
+        """ Doctors with no booking overlapping [start, start + duration) """
+        start = to_datetime(start)
+        end = start + self._duration(duration)
+        doctors = self._doctor_starts if doctors is None else doctors
+        return [doctor for doctor in doctors if self._conflict(doctor, start, end) is None]
@@ -1,5 +1,8 @@
 # src/ds/bst_doctorlookup.py
 #by Michelle
+from bisect import bisect_left
+from itertools import islice
+
 
 class Doctor:
     def __init__(self, name, specialty):
@@ -15,39 +18,172 @@ class Node:
         self.doctor = doctor
         self.left = None
         self.right = None
+        self.height = 1
+        self.size = 1  # number of doctors in this subtree, for rank queries
+
+
+# AVL helpers: every subtree keeps its height so rotations can restore balance,
+# and its size so the k-th doctor and a name's rank can be found in O(log n)
+def _height(node):
+    return node.height if node else 0
+
+
+def _size(node):
+    return node.size if node else 0
+
+
+def _update(node):
+    node.height = 1 + max(_height(node.left), _height(node.right))
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+
+def _balanceFactor(node):
+    return _height(node.left) - _height(node.right)
+
+
+def _rotateRight(node):
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _rotateLeft(node):
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _rebalance(node):
+    _update(node)
+    balance = _balanceFactor(node)
+    if balance > 1:
+        if _balanceFactor(node.left) < 0:
+            node.left = _rotateLeft(node.left)
+        return _rotateRight(node)
+    if balance < -1:
+        if _balanceFactor(node.right) > 0:
+            node.right = _rotateRight(node.right)
+        return _rotateLeft(node)
+    return node
+
+
+class SpecialtyIndex:
+    # specialty -> doctors sorted by name, kept as parallel name/doctor lists
+    # so "all cardiologists" is a dictionary lookup plus an O(k) copy
+
+    def __init__(self):
+        self.names = {}
+        self.doctors = {}
+
+    @staticmethod
+    def _key(specialty):
+        return str(specialty).strip().lower()
+
+    def add(self, doctor):
+        key = self._key(doctor.specialty)
+        names = self.names.setdefault(key, [])
+        i = bisect_left(names, doctor.name)
+        names.insert(i, doctor.name)
+        self.doctors.setdefault(key, []).insert(i, doctor)
+
+    def remove(self, doctor):
+        key = self._key(doctor.specialty)
+        names = self.names.get(key)
+        if not names:
+            return
+        i = bisect_left(names, doctor.name)
+        if i < len(names) and names[i] == doctor.name:
+            del names[i]
+            del self.doctors[key][i]
+            if not names:
+                del self.names[key]
+                del self.doctors[key]
+
+    def append(self, doctor):
+        # For callers feeding doctors in name order: O(1) instead of a bisect insert
+        key = self._key(doctor.specialty)
+        self.names.setdefault(key, []).append(doctor.name)
+        self.doctors.setdefault(key, []).append(doctor)
+
+    def lookup(self, specialty):
+        return list(self.doctors.get(self._key(specialty), ()))
+
+    def specialtyCounts(self):
+        return {key: len(names) for key, names in self.names.items()}
 
 
 class DoctorBST:
+    # Self-balancing (AVL) tree keyed on doctor name, so the height stays
+    # O(log n) even when doctors are inserted in name order
     def __init__(self):
         self.root = None
+        self.specialties = SpecialtyIndex()
+
+    def __len__(self):
+        return _size(self.root)
+
+    @classmethod
+    def fromSorted(cls, doctors):
+        # Builds a perfectly balanced tree in O(n) from doctors in name order,
+        # e.g. SELECT ... ORDER BY name. Input that is not strictly increasing
+        # is sorted (keeping the first of any duplicate names) before the build.
+        doctors = list(doctors)
+        if any(doctors[i].name >= doctors[i + 1].name for i in range(len(doctors) - 1)):
+            unique = {}
+            for doctor in doctors:
+                unique.setdefault(doctor.name, doctor)
+            doctors = sorted(unique.values(), key=lambda doctor: doctor.name)
+
+        def _build(lo, hi):
+            if lo >= hi:
+                return None
+            mid = (lo + hi) // 2
+            node = Node(doctors[mid])
+            node.left = _build(lo, mid)
+            node.right = _build(mid + 1, hi)
+            _update(node)
+            return node
+
+        tree = cls()
+        tree.root = _build(0, len(doctors))
+        for doctor in doctors:
+            tree.specialties.append(doctor)
+        return tree
 
     def insertDoctor(self, doctor):
         def _insert(node, doctor):
             if not node:
+                self.specialties.add(doctor)
                 return Node(doctor)
             if doctor.name < node.doctor.name:
                 node.left = _insert(node.left, doctor)
             elif doctor.name > node.doctor.name:
                 node.right = _insert(node.right, doctor)
-            return node
+            else:
+                return node
+            return _rebalance(node)
         self.root = _insert(self.root, doctor)
 
     def searchDoctor(self, name):
-        def _search(node, name):
-            if not node:
-                return None
+        node = self.root
+        while node:
             if name == node.doctor.name:
                 return node.doctor
-            elif name < node.doctor.name:
-                return _search(node.left, name)
-            else:
-                return _search(node.right, name)
-        return _search(self.root, name)
+            node = node.left if name < node.doctor.name else node.right
+        return None
 
     def updateDoctor(self, name, new_specialty):
         doctor = self.searchDoctor(name)
         if doctor:
+            self.specialties.remove(doctor)
             doctor.specialty = new_specialty
+            self.specialties.add(doctor)
             return True
         return False
 
@@ -67,8 +203,11 @@ class DoctorBST:
                 min_larger = self.getMin(node.right)
                 node.doctor = min_larger.doctor
                 node.right = _delete(node.right, min_larger.doctor.name)
-            return node
-        self.root = _delete(self.root, name)
+            return _rebalance(node)
+        doctor = self.searchDoctor(name)
+        if doctor:
+            self.specialties.remove(doctor)
+            self.root = _delete(self.root, name)
 
     def getMin(self, node):
         while node.left:
@@ -76,6 +215,107 @@ class DoctorBST:
         return node
 
     def inorderTraversal(self):
-        def _inorder(node):
-            return _inorder(node.left) + [node.doctor] + _inorder(node.right) if node else []
-        return _inorder(self.root)
+        return list(self.iterDoctors())
+
+    def iterDoctors(self, start=None, reverse=False):
+        # Streams doctors in name order (or reverse order) with an explicit
+        # stack, so it uses O(height) memory and never recurses. With start,
+        # iteration begins at the first name >= start (<= start when reversed).
+        stack = []
+        node = self.root
+        near, far = ("right", "left") if reverse else ("left", "right")
+
+        # Seed the stack with the path to start, keeping only the ancestors
+        # that are themselves part of the range
+        while node:
+            name = node.doctor.name
+            if start is not None and (name > start if reverse else name < start):
+                node = getattr(node, far)
+            else:
+                stack.append(node)
+                node = getattr(node, near)
+
+        while stack:
+            node = stack.pop()
+            yield node.doctor
+            node = getattr(node, far)
+            while node:
+                stack.append(node)
+                node = getattr(node, near)
+
+    def rangeSearch(self, low, high):
+        # All doctors with low <= name <= high, in O(log n + k)
+        doctors = []
+        for doctor in self.iterDoctors(start=low):
+            if doctor.name > high:
+                break
+            doctors.append(doctor)
+        return doctors
+
+    def prefixSearch(self, prefix, limit=None):
+        # Doctors whose name starts with prefix, e.g. prefixSearch("Mwa")
+        matches = []
+        for doctor in self.iterDoctors(start=prefix):
+            if not doctor.name.startswith(prefix) or (limit is not None and len(matches) >= limit):
+                break
+            matches.append(doctor)
+        return matches
+
+    def kthDoctor(self, k):
+        # The doctor at 0-based position k in name order, or None
+        if k < 0 or k >= len(self):
+            return None
+        node = self.root
+        while node:
+            left = _size(node.left)
+            if k < left:
+                node = node.left
+            elif k == left:
+                return node.doctor
+            else:
+                k -= left + 1
+                node = node.right
+        return None
+
+    def rankOf(self, name):
+        # Number of doctors whose name sorts before name
+        rank = 0
+        node = self.root
+        while node:
+            if name <= node.doctor.name:
+                node = node.left
+            else:
+                rank += _size(node.left) + 1
+                node = node.right
+        return rank
+
+    def getPage(self, page, page_size):
+        # One page of the roster in name order without materialising the rest
+        first = self.kthDoctor(page * page_size)
+        if first is None:
+            return []
+        return list(islice(self.iterDoctors(start=first.name), page_size))
+
+    def doctorsBySpecialty(self, specialty):
+        # Doctors with this specialty in name order, O(k) via the specialty index
+        return self.specialties.lookup(specialty)
+
+    def getHeight(self):
+        return _height(self.root)
+
+    def getBalanceStats(self):
+        # Walks the whole tree to verify the AVL invariant rather than trusting
+        # the cached heights
+        stats = {"size": 0, "height": 0, "max_imbalance": 0}
+
+        def _walk(node):
+            if not node:
+                return 0
+            left = _walk(node.left)
+            right = _walk(node.right)
+            stats["size"] += 1
+            stats["max_imbalance"] = max(stats["max_imbalance"], abs(left - right))
+            return 1 + max(left, right)
+
+        stats["height"] = _walk(self.root)
+        return stats
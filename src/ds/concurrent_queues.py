@@ -0,0 +1,247 @@
+# concurrent_queues.py
+# Thread-safe versions of the triage and appointment queues, for kiosks and
+# intake workers feeding patients while clinician stations take them.
+import threading
+import time
+from queue import Empty, Full
+
+from .priorityQueue import PriorityQueue
+
+
+class QueueClosed(Exception):
+    """ Raised by put on a closed queue, and by get once a closed queue is empty """
+
+
+def _deadline(timeout):
+    return None if timeout is None else time.monotonic() + timeout
+
+
+def _remaining(deadline):
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class BlockingPriorityQueue:
+    """ PriorityQueue behind one lock with not_empty / not_full conditions.
+
+    A heap cannot be split between producers and consumers, so the lock is
+    held only for the O(log n) heap operation itself. Batched put_many and
+    pop_many pay for it once per batch.
+    """
+
+    def __init__(self, maxsize=0, **options):
+        self.maxsize = maxsize  # 0 means unbounded
+        self._queue = PriorityQueue(**options)
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+
+    def __len__(self):
+        with self._lock:
+            return self._queue.size()
+
+    def _wait_for_room(self, needed, deadline):
+        while self.maxsize and self._queue.size() + needed > self.maxsize:
+            if self._closed:
+                raise QueueClosed()
+            remaining = _remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise Full()
+            self._not_full.wait(remaining)
+        if self._closed:
+            raise QueueClosed()
+
+    def _wait_for_item(self, deadline):
+        while self._queue.is_empty():
+            if self._closed:
+                raise QueueClosed()
+            remaining = _remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise Empty()
+            self._not_empty.wait(remaining)
+
+    def put(self, name, priority, timeout=None):
+        """ Queue a patient and return its handle; waits while the queue is full """
+        with self._lock:
+            self._wait_for_room(1, _deadline(timeout))
+            handle = self._queue.insert(name, priority)
+            self._not_empty.notify()
+            return handle
+
+    def put_many(self, patients, timeout=None):
+        """ Queue (name, priority) pairs under one lock acquisition """
+        patients = list(patients)
+        if self.maxsize and len(patients) > self.maxsize:
+            raise ValueError("Batch is larger than the queue")
+        with self._lock:
+            self._wait_for_room(len(patients), _deadline(timeout))
+            handles = [self._queue.insert(name, priority) for name, priority in patients]
+            self._not_empty.notify(len(handles))
+            return handles
+
+    def get(self, block=True, timeout=None):
+        """ Highest priority patient. Raises Empty on timeout (or when not blocking) """
+        with self._lock:
+            if not block and self._queue.is_empty():
+                if self._closed:
+                    raise QueueClosed()
+                raise Empty()
+            self._wait_for_item(_deadline(timeout))
+            patient = self._queue.remove_highest_priority()
+            self._not_full.notify()
+            return patient
+
+    def pop_many(self, max_items, timeout=None):
+        """ Up to max_items patients in priority order; waits for at least one """
+        with self._lock:
+            self._wait_for_item(_deadline(timeout))
+            batch = []
+            while len(batch) < max_items and not self._queue.is_empty():
+                batch.append(self._queue.remove_highest_priority())
+            self._not_full.notify(len(batch))
+            return batch
+
+    def close(self):
+        """ Refuse new patients. Waiting consumers drain what is left, then get QueueClosed """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def drain(self):
+        """ Remove and return every queued patient in priority order """
+        with self._lock:
+            drained = []
+            while not self._queue.is_empty():
+                drained.append(self._queue.remove_highest_priority())
+            self._not_full.notify_all()
+            return drained
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class _Node:
+    __slots__ = ("data", "next")
+
+    def __init__(self, data):
+        self.data = data
+        self.next = None
+
+
+class BlockingAppointmentQueue:
+    """ FIFO appointment queue with separate locks for the two ends.
+
+    Producers only take the tail lock and consumers only take the head lock
+    (a two-lock linked queue), so arrivals and serves do not contend with
+    each other. A dummy head node keeps the two ends from sharing a node.
+    The item count has its own tiny lock.
+    """
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize  # 0 means unbounded
+        self._head = self._tail = _Node(None)
+        self._count = 0
+        self._count_lock = threading.Lock()
+        self._head_lock = threading.Lock()
+        self._tail_lock = threading.Lock()
+        self._not_empty = threading.Condition(self._head_lock)
+        self._not_full = threading.Condition(self._tail_lock)
+        self._closed = False
+
+    def __len__(self):
+        return self._count
+
+    def _add_count(self, delta):
+        # Returns the count before the change
+        with self._count_lock:
+            before = self._count
+            self._count += delta
+            return before
+
+    def _signal_not_empty(self):
+        with self._head_lock:
+            self._not_empty.notify_all()
+
+    def _signal_not_full(self):
+        with self._tail_lock:
+            self._not_full.notify_all()
+
+    def put(self, patient_data, timeout=None):
+        self.put_many([patient_data], timeout)
+
+    def put_many(self, items, timeout=None):
+        items = list(items)
+        if not items:
+            return
+        if self.maxsize and len(items) > self.maxsize:
+            raise ValueError("Batch is larger than the queue")
+        deadline = _deadline(timeout)
+        with self._tail_lock:
+            while self.maxsize and self._count + len(items) > self.maxsize:
+                if self._closed:
+                    raise QueueClosed()
+                remaining = _remaining(deadline)
+                if remaining is not None and remaining <= 0:
+                    raise Full()
+                self._not_full.wait(remaining)
+            if self._closed:
+                raise QueueClosed()
+            for item in items:
+                node = _Node(item)
+                self._tail.next = node
+                self._tail = node
+            before = self._add_count(len(items))
+        if before == 0:
+            self._signal_not_empty()
+
+    def get(self, block=True, timeout=None):
+        if not block:
+            timeout = 0
+        return self.pop_many(1, timeout)[0]
+
+    def pop_many(self, max_items, timeout=None):
+        """ Up to max_items appointments in arrival order; waits for at least one """
+        deadline = _deadline(timeout)
+        with self._head_lock:
+            while self._count == 0:
+                if self._closed:
+                    raise QueueClosed()
+                remaining = _remaining(deadline)
+                if remaining is not None and remaining <= 0:
+                    raise Empty()
+                self._not_empty.wait(remaining)
+            batch = []
+            # Only nodes counted by a finished put are taken, so the tail end
+            # is never touched here
+            available = min(max_items, self._count)
+            for _ in range(available):
+                first = self._head.next
+                batch.append(first.data)
+                first.data = None
+                self._head = first  # first becomes the new dummy
+            before = self._add_count(-available)
+            if before - available > 0:
+                self._not_empty.notify()
+        if self.maxsize:
+            self._signal_not_full()
+        return batch
+
+    def close(self):
+        self._closed = True
+        self._signal_not_empty()
+        self._signal_not_full()
+
+    def drain(self):
+        drained = []
+        while self._count:
+            try:
+                drained.extend(self.pop_many(self._count, timeout=0))
+            except (Empty, QueueClosed):
+                break
+        return drained
+
+    @property
+    def closed(self):
+        return self._closed
@@ -0,0 +1,147 @@
+# department_queues.py
+import heapq
+import itertools
+import time
+
+from .priorityQueue import PriorityQueue
+
+
+class DepartmentQueues:
+    """ One PriorityQueue per department, with shared clinicians pulling work.
+
+    Two ways to take the next patient:
+      * serve_next() takes the most urgent patient hospital-wide. A heap over
+        the department heads finds them in O(log d).
+      * dispatch() shares clinicians between departments by weight using
+        stride scheduling. A department with weight 2 is picked twice as often
+        as one with weight 1 while both have patients waiting, and within a
+        department patients are still served by priority.
+
+    All departments draw arrival numbers from one sequence, so handles are
+    unique hospital-wide and equal priorities tie-break by arrival across
+    departments.
+    """
+
+    STRIDE = 1_000_000
+
+    def __init__(self, sequence=None, aging_interval=None, clock=time.time):
+        self.sequence = sequence or itertools.count().__next__
+        self.aging_interval = aging_interval
+        self.clock = clock
+        self.queues = {}
+        self.weights = {}
+
+        # Global view: (head key, version, department). A department's entry is
+        # stale once its version moves on; stale entries are skipped lazily.
+        self._heads = []
+        self._versions = {}
+
+        # Fair share: (pass, department) for departments with waiting patients.
+        # Each pick advances the department's pass by STRIDE / weight.
+        self._active = []
+        self._in_active = set()
+        self._passes = {}
+        self._virtual_time = 0
+
+    def __len__(self):
+        return sum(queue.size() for queue in self.queues.values())
+
+    def add_department(self, department, weight=1):
+        if department not in self.queues:
+            self.queues[department] = PriorityQueue(self.sequence, self.aging_interval, self.clock)
+            self._versions[department] = 0
+            self._passes[department] = self._virtual_time
+        self.set_weight(department, weight)
+        return self.queues[department]
+
+    def set_weight(self, department, weight):
+        if weight <= 0:
+            raise ValueError("Department weight must be positive")
+        self.weights[department] = weight
+
+    def _queue(self, department):
+        queue = self.queues.get(department)
+        if queue is None:
+            raise KeyError(f"Unknown department: {department}")
+        return queue
+
+    def _refresh_head(self, department):
+        self._versions[department] += 1
+        key = self.queues[department].head_key()
+        if key is not None:
+            heapq.heappush(self._heads, (key, self._versions[department], department))
+        # Stale entries are dropped lazily; rebuild if they pile up
+        if len(self._heads) > 4 * len(self.queues) + 16:
+            self._heads = [(queue.head_key(), self._versions[name], name)
+                           for name, queue in self.queues.items() if queue.size()]
+            heapq.heapify(self._heads)
+
+    def _activate(self, department):
+        if department not in self._in_active:
+            # A department that was idle does not bank credit while empty
+            self._passes[department] = max(self._passes[department], self._virtual_time)
+            heapq.heappush(self._active, (self._passes[department], department))
+            self._in_active.add(department)
+
+    def insert(self, department, name, priority):
+        """ Queue a patient in a department and return its handle """
+        queue = self._queue(department)
+        handle = queue.insert(name, priority)
+        self._refresh_head(department)
+        self._activate(department)
+        return handle
+
+    def update_priority(self, department, handle, new_priority):
+        updated = self._queue(department).update_priority(handle, new_priority)
+        if updated:
+            self._refresh_head(department)
+        return updated
+
+    def remove(self, department, handle):
+        patient = self._queue(department).remove(handle)
+        if patient:
+            self._refresh_head(department)
+        return patient
+
+    def peek_next(self):
+        """ (department, patient) that serve_next() would return, or None """
+        heads = self._heads
+        while heads:
+            _, version, department = heads[0]
+            if version == self._versions[department]:
+                return department, self.queues[department].peek()
+            heapq.heappop(heads)
+        return None
+
+    def serve_next(self):
+        """ Serve the most urgent patient across all departments """
+        head = self.peek_next()
+        if head is None:
+            return None
+        department = head[0]
+        patient = self.queues[department].remove_highest_priority()
+        self._refresh_head(department)
+        return department, patient
+
+    def dispatch(self):
+        """ Serve the next patient from the department whose fair share is due """
+        while self._active:
+            current_pass, department = heapq.heappop(self._active)
+            queue = self.queues[department]
+            if queue.is_empty():
+                self._in_active.discard(department)
+                continue
+
+            patient = queue.remove_highest_priority()
+            self._refresh_head(department)
+            self._virtual_time = current_pass
+            self._passes[department] = current_pass + self.STRIDE / self.weights[department]
+            if queue.is_empty():
+                self._in_active.discard(department)
+            else:
+                heapq.heappush(self._active, (self._passes[department], department))
+            return department, patient
+        return None
+
+    def sizes(self):
+        return {department: queue.size() for department, queue in self.queues.items()}
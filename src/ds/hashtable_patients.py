@@ -1,3 +1,7 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
 class Patient:
     def __init__(self, id, name, age, condition):
         self.id = id
@@ -7,51 +11,461 @@ class Patient:
 
     def __str__(self):
         return f"{self.id} - {self.name}"
-    
+
     def __repr__(self):
         return self.__str__()
-    
+
+
+class PatientRecord:
+    # Same fields as Patient without a per-instance __dict__, for tables that
+    # hold the whole patients registry in memory
+    __slots__ = ("id", "name", "age", "condition")
+
+    def __init__(self, id, name, age, condition):
+        self.id = id
+        self.name = name
+        self.age = age
+        self.condition = condition
+
+    def __str__(self):
+        return f"{self.id} - {self.name}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class PatientIndex:
+    # Secondary indexes kept next to a patient table: condition -> set of ids,
+    # and ages / age_ids, parallel lists sorted by (age, id) for range queries.
+    # Parallel lists cost two pointers per patient instead of a tuple each.
+
+    def __init__(self):
+        self.by_condition = {}
+        self.ages = []
+        self.age_ids = []
+
+    @staticmethod
+    def _conditionKey(condition):
+        return str(condition).strip().lower()
+
+    @staticmethod
+    def _ageKey(age):
+        # The UI stores age as typed; unparseable ages are left out of the age index
+        try:
+            return int(age)
+        except (TypeError, ValueError):
+            return None
+
+    def add(self, patient, defer_sort=False):
+        self.by_condition.setdefault(self._conditionKey(patient.condition), set()).add(patient.id)
+        age = self._ageKey(patient.age)
+        if age is not None:
+            if defer_sort:
+                # Bulk loads append and call sortAges() once at the end
+                self.ages.append(age)
+                self.age_ids.append(patient.id)
+            else:
+                i = self._agePosition(age, patient.id)
+                self.ages.insert(i, age)
+                self.age_ids.insert(i, patient.id)
+
+    def _agePosition(self, age, patient_id):
+        # Ids are kept sorted within each run of equal ages
+        lo = bisect_left(self.ages, age)
+        hi = bisect_right(self.ages, age, lo)
+        return bisect_left(self.age_ids, patient_id, lo, hi)
+
+    def sortAges(self):
+        pairs = sorted(zip(self.ages, self.age_ids))
+        self.ages = [age for age, _ in pairs]
+        self.age_ids = [patient_id for _, patient_id in pairs]
+
+    def remove(self, patient):
+        key = self._conditionKey(patient.condition)
+        ids = self.by_condition.get(key)
+        if ids is not None:
+            ids.discard(patient.id)
+            if not ids:
+                del self.by_condition[key]
+
+        age = self._ageKey(patient.age)
+        if age is not None:
+            i = self._agePosition(age, patient.id)
+            if i < len(self.ages) and self.ages[i] == age and self.age_ids[i] == patient.id:
+                del self.ages[i]
+                del self.age_ids[i]
+
+    def idsByCondition(self, condition):
+        return set(self.by_condition.get(self._conditionKey(condition), ()))
+
+    def idsByAgeRange(self, low, high):
+        # Inclusive on both ends, O(log n + k); bounds are read like stored ages
+        low_key, high_key = self._ageKey(low), self._ageKey(high)
+        if low_key is None or high_key is None:
+            raise ValueError(f"Invalid age range: {low!r} to {high!r}")
+        start = bisect_left(self.ages, low_key)
+        end = bisect_right(self.ages, high_key, start)
+        return self.age_ids[start:end]
+
+    def countsByCondition(self):
+        return {condition: len(ids) for condition, ids in self.by_condition.items()}
+
 
 class HashTable:
+    MAX_LOAD_FACTOR = 0.75  # grow once the table is fuller than this
+    MIN_LOAD_FACTOR = 0.1   # shrink (down to the initial size) below this
+    REHASH_STEP = 4         # old buckets migrated on every operation while resizing
+
     def __init__(self, size=10):
         self.size = size
+        self.initial_size = size
         self.table = [[] for _ in range(size)]
+        self.count = 0
+        self.resizes = 0
+        self.index = PatientIndex()
+
+        # While resizing, entries live in both tables. Every operation moves a
+        # few buckets across so no single add pays for the whole rehash.
+        self._old_table = None
+        self._rehash_index = 0
+
+    def __len__(self):
+        return self.count
 
     def _hash(self, key):
         return hash(key) % self.size
-    
+
+    def _findBucket(self, key):
+        # Buckets below _rehash_index have already been moved to the new table
+        if self._old_table is not None:
+            old_index = hash(key) % len(self._old_table)
+            if old_index >= self._rehash_index:
+                bucket = self._old_table[old_index]
+                for i, p in enumerate(bucket):
+                    if p.id == key:
+                        return bucket, i
+
+        bucket = self.table[self._hash(key)]
+        for i, p in enumerate(bucket):
+            if p.id == key:
+                return bucket, i
+
+        return None, -1
+
+    def _rehashStep(self, steps=REHASH_STEP):
+        if self._old_table is None:
+            return
+
+        old_size = len(self._old_table)
+        while steps > 0 and self._rehash_index < old_size:
+            for patient in self._old_table[self._rehash_index]:
+                self.table[self._hash(patient.id)].append(patient)
+            self._old_table[self._rehash_index] = []
+            self._rehash_index += 1
+            steps -= 1
+
+        if self._rehash_index >= old_size:
+            self._old_table = None
+            self._rehash_index = 0
+
+    def _resize(self, new_size):
+        # Finish any rehash still in flight before starting another one
+        if self._old_table is not None:
+            self._rehashStep(len(self._old_table))
+
+        self._old_table = self.table
+        self._rehash_index = 0
+        self.size = new_size
+        self.table = [[] for _ in range(new_size)]
+        self.resizes += 1
+
+    def _checkResize(self):
+        load = self.getLoadFactor()
+        if load > self.MAX_LOAD_FACTOR:
+            self._resize(self.size * 2)
+        elif load < self.MIN_LOAD_FACTOR and self.size > self.initial_size:
+            self._resize(max(self.initial_size, self.size // 2))
 
     def addPatient(self, patient):
-        index = self._hash(patient.id)
+        self._rehashStep()
 
         # Check for duplicates
-        for existing in self.table[index]:
-            if existing.id == patient.id:
-                return False 
-            
-        self.table[index].append(patient)
+        bucket, _ = self._findBucket(patient.id)
+        if bucket is not None:
+            return False
+
+        self.table[self._hash(patient.id)].append(patient)
+        self.count += 1
+        self.index.add(patient)
+        self._checkResize()
         return True
-    
+
     def getPatient(self, patient_id):
-        index = self._hash(patient_id)
-        for i, p in enumerate(self.table[index]):
-            if p.id == patient_id:
-                return p
-            
+        self._rehashStep()
+        bucket, i = self._findBucket(patient_id)
+        if bucket is not None:
+            return bucket[i]
+
         return None
-    
+
     def removePatient(self, patient_id):
-        index = self._hash(patient_id)
+        self._rehashStep()
+        bucket, i = self._findBucket(patient_id)
+        if bucket is not None:
+            self.index.remove(bucket[i])
+            del bucket[i]
+            self.count -= 1
+            self._checkResize()
+            return True
 
-        for i, p in enumerate(self.table[index]):
-            if p.id == patient_id:
-                del self.table[index][i]
-                return True
-            
         return False
-    
+
     def getPatients(self):
         all_patients = []
+        if self._old_table is not None:
+            for bucket in self._old_table:
+                all_patients.extend(bucket)
         for bucket in self.table:
             all_patients.extend(bucket)
         return all_patients
+
+    def getLoadFactor(self):
+        return self.count / self.size
+
+    def getBucketHistogram(self):
+        # Maps bucket length -> number of buckets with that length
+        histogram = {}
+        buckets = self.table
+        if self._old_table is not None:
+            buckets = self._old_table[self._rehash_index:] + self.table
+        for bucket in buckets:
+            histogram[len(bucket)] = histogram.get(len(bucket), 0) + 1
+        return histogram
+
+    def getResizeCount(self):
+        return self.resizes
+
+    def isRehashing(self):
+        return self._old_table is not None
+
+    def reserve(self, expected_count):
+        # Presize so expected_count patients fit without any further resize
+        needed = int(expected_count / self.MAX_LOAD_FACTOR) + 1
+        if needed > self.size:
+            self._resize(needed)
+            self._rehashStep(len(self._old_table))
+
+    def bulkLoad(self, patients, check_duplicates=True):
+        # Loads an iterable of patients in one pass. Pass check_duplicates=False
+        # when the source is keyed on id (e.g. the patients table) to skip the
+        # per-row bucket scan. Returns the number of patients added.
+        added = 0
+        for patient in patients:
+            if check_duplicates and self._findBucket(patient.id)[0] is not None:
+                continue
+            self.table[self._hash(patient.id)].append(patient)
+            self.index.add(patient, defer_sort=True)
+            self.count += 1
+            added += 1
+            if self.count > self.size * self.MAX_LOAD_FACTOR:
+                self.reserve(self.count * 2)
+        self.index.sortAges()
+        return added
+
+    def getPatientsByCondition(self, condition):
+        return [self.getPatient(patient_id) for patient_id in self.index.idsByCondition(condition)]
+
+    def getPatientsByAgeRange(self, low, high):
+        return [self.getPatient(patient_id) for patient_id in self.index.idsByAgeRange(low, high)]
+
+
+class CompactHashTable:
+    """Open-addressing patient table with the same interface as HashTable.
+
+    Entries live in flat, insertion-ordered arrays of hashes and records (a
+    record's id is its key).
+    The probe table only holds positions into those arrays and is searched with
+    Robin Hood linear probing, so a lookup touches a couple of machine words
+    instead of a Python list per bucket.
+    """
+
+    MAX_LOAD_FACTOR = 0.75
+    MIN_LOAD_FACTOR = 0.1
+    EMPTY = -1
+
+    def __init__(self, size=8):
+        capacity = 8
+        while capacity < size:
+            capacity *= 2
+        self.size = capacity
+        self.initial_size = capacity
+        self.resizes = 0
+        self.index = PatientIndex()
+
+        self._slots = array("q", [self.EMPTY]) * capacity  # probe table: slot -> position in the dense arrays
+        self._hashes = array("q")
+        self._records = []
+
+    def __len__(self):
+        return len(self._records)
+
+    def _probeDistance(self, slot, h):
+        return (slot - (h & (self.size - 1))) & (self.size - 1)
+
+    def _lookup(self, key):
+        # Returns (slot, position) for key, or (EMPTY, EMPTY) when it is absent
+        h = hash(key)
+        mask = self.size - 1
+        slot = h & mask
+        distance = 0
+        while True:
+            pos = self._slots[slot]
+            if pos == self.EMPTY:
+                return self.EMPTY, self.EMPTY
+            existing = self._hashes[pos]
+            if existing == h and self._records[pos].id == key:
+                return slot, pos
+            # Robin Hood invariant: once we pass an entry closer to its home
+            # slot than we are to ours, the key cannot be further along
+            if self._probeDistance(slot, existing) < distance:
+                return self.EMPTY, self.EMPTY
+            slot = (slot + 1) & mask
+            distance += 1
+
+    def _insertIndex(self, pos):
+        mask = self.size - 1
+        slot = self._hashes[pos] & mask
+        distance = 0
+        while True:
+            current = self._slots[slot]
+            if current == self.EMPTY:
+                self._slots[slot] = pos
+                return
+            current_distance = self._probeDistance(slot, self._hashes[current])
+            if current_distance < distance:
+                # Take the slot from the richer entry and keep placing it instead
+                self._slots[slot] = pos
+                pos = current
+                distance = current_distance
+            slot = (slot + 1) & mask
+            distance += 1
+
+    def _deleteSlot(self, slot):
+        # Backward-shift deletion keeps probe runs tombstone free
+        mask = self.size - 1
+        following = (slot + 1) & mask
+        while True:
+            pos = self._slots[following]
+            if pos == self.EMPTY or self._probeDistance(following, self._hashes[pos]) == 0:
+                break
+            self._slots[slot] = pos
+            slot = following
+            following = (following + 1) & mask
+        self._slots[slot] = self.EMPTY
+
+    def _resize(self, new_size):
+        self.size = new_size
+        self._slots = array("q", [self.EMPTY]) * new_size
+        for pos in range(len(self._records)):
+            self._insertIndex(pos)
+        self.resizes += 1
+
+    def addPatient(self, patient):
+        slot, _ = self._lookup(patient.id)
+        if slot != self.EMPTY:
+            return False
+
+        self._hashes.append(hash(patient.id))
+        self._records.append(patient)
+        self.index.add(patient)
+        if len(self._records) > self.size * self.MAX_LOAD_FACTOR:
+            self._resize(self.size * 2)
+        else:
+            self._insertIndex(len(self._records) - 1)
+        return True
+
+    def getPatient(self, patient_id):
+        _, pos = self._lookup(patient_id)
+        if pos == self.EMPTY:
+            return None
+        return self._records[pos]
+
+    def removePatient(self, patient_id):
+        slot, pos = self._lookup(patient_id)
+        if slot == self.EMPTY:
+            return False
+
+        self._deleteSlot(slot)
+        self.index.remove(self._records[pos])
+
+        # Fill the hole in the dense arrays with the last entry
+        last = len(self._records) - 1
+        if pos != last:
+            moved_slot, _ = self._lookup(self._records[last].id)
+            self._slots[moved_slot] = pos
+            self._hashes[pos] = self._hashes[last]
+            self._records[pos] = self._records[last]
+        self._hashes.pop()
+        self._records.pop()
+
+        if self.getLoadFactor() < self.MIN_LOAD_FACTOR and self.size > self.initial_size:
+            self._resize(max(self.initial_size, self.size // 2))
+        return True
+
+    def getPatients(self):
+        return list(self._records)
+
+    def getLoadFactor(self):
+        return len(self._records) / self.size
+
+    def getBucketHistogram(self):
+        # There are no buckets here: maps probe distance -> number of entries
+        histogram = {}
+        for slot, pos in enumerate(self._slots):
+            if pos != self.EMPTY:
+                distance = self._probeDistance(slot, self._hashes[pos])
+                histogram[distance] = histogram.get(distance, 0) + 1
+        return histogram
+
+    def getResizeCount(self):
+        return self.resizes
+
+    def getPatientsByCondition(self, condition):
+        return [self.getPatient(patient_id) for patient_id in self.index.idsByCondition(condition)]
+
+    def getPatientsByAgeRange(self, low, high):
+        return [self.getPatient(patient_id) for patient_id in self.index.idsByAgeRange(low, high)]
+
+    def reserve(self, expected_count):
+        capacity = self.size
+        while expected_count > capacity * self.MAX_LOAD_FACTOR:
+            capacity *= 2
+        if capacity > self.size:
+            self._resize(capacity)
+
+    def bulkLoad(self, patients, check_duplicates=True):
+        # Same contract as HashTable.bulkLoad
+        added = 0
+        for patient in patients:
+            if check_duplicates and self._lookup(patient.id)[0] != self.EMPTY:
+                continue
+            self._hashes.append(hash(patient.id))
+            self._records.append(patient)
+            self.index.add(patient, defer_sort=True)
+            added += 1
+            if len(self._records) > self.size * self.MAX_LOAD_FACTOR:
+                self._resize(self.size * 2)
+            else:
+                self._insertIndex(len(self._records) - 1)
+        self.index.sortAges()
+        return added
+
+
+def create_patient_table(size=10, backend="chaining"):
+    # "chaining" keeps the original list-of-buckets HashTable, "open" selects
+    # the compact open-addressing table
+    if backend == "chaining":
+        return HashTable(size)
+    if backend == "open":
+        return CompactHashTable(size)
+    raise ValueError(f"Unknown patient table backend: {backend}")
@@ -0,0 +1,81 @@
+# lru_cache.py
+from collections import OrderedDict
+
+
+class LRUCache:
+    """ Key/value cache that evicts the least recently used entry.
+
+    Bounded by entry count (max_entries), total size (max_bytes, measured
+    with sizeof), or both. The OrderedDict keeps entries in recency order,
+    so a lookup, an insert and an eviction are all O(1).
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=None):
+        if max_entries is None and max_bytes is None:
+            raise ValueError("LRUCache needs max_entries, max_bytes or both")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 1)
+        self._entries = OrderedDict()  # key -> (value, size), oldest first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        # Membership does not count as a use
+        return key in self._entries
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def peek(self, key, default=None):
+        """ Look a value up without touching recency or the counters """
+        entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key, value):
+        """ Insert or refresh an entry; returns False if it is too big to cache """
+        self.invalidate(key)
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+        self._entries[key] = (value, size)
+        self.bytes += size
+        self._evict()
+        return True
+
+    def invalidate(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry[1]
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def _evict(self):
+        while ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+               (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions, "hit_rate": self.hit_rate()}
@@ -1,10 +1,18 @@
 # priority_queue.py
+import datetime
+import heapq
+import time
+from itertools import islice
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 class Patient:
-    def __init__(self, name, priority, arrival_order):
+    def __init__(self, name, priority, arrival_order, enqueued_at=None):
         self.name = name
         self.priority = priority
         self.arrival_order = arrival_order
+        self.enqueued_at = enqueued_at  # clock reading when queued, for aging and wait times
 
     def __lt__(self, other):
         if self.priority == other.priority:
@@ -16,23 +24,185 @@ class Patient:
 
 # priority class to handle the heap
 class PriorityQueue:
-    def __init__(self):
+    def __init__(self, sequence=None, aging_interval=None, clock=time.time):
+        # heap holds the Patient objects; _keys holds a (rank, arrival_order)
+        # tuple for the patient at the same index, where rank is the priority
+        # (adjusted for aging when enabled). Sifting compares the tuples,
+        # which runs in C, instead of calling Patient.__lt__ at every step.
         self.heap = []
+        self._keys = []
+        # A patient's arrival_order doubles as its handle; _positions maps each
+        # handle to its current index in the heap
+        self._positions = {}
         self.counter = 0  # will be used to track the arrival order
+        # Optional callable handing out arrival numbers, e.g. a database-backed
+        # sequence shared with other processes; defaults to the local counter
+        self.sequence = sequence
+
+        # Aging: with aging_interval set, a patient's effective priority improves
+        # by one level for every aging_interval seconds spent waiting. Everyone
+        # ages at the same rate, so ranking by priority + enqueued_at / interval
+        # gives exactly that order and never needs re-scoring after insert.
+        self.aging_interval = aging_interval
+        self.clock = clock
+        self._wait_stats = {}  # priority -> [served, total wait, longest wait]
+
+    def _key(self, patient):
+        if self.aging_interval:
+            return (patient.priority + patient.enqueued_at / self.aging_interval, patient.arrival_order)
+        return (patient.priority, patient.arrival_order)
+
+    @classmethod
+    def from_rows(cls, rows, sequence=None, restore_arrival_times=True, **options):
+        """ Rebuild a queue from (name, priority, arrival_order[, arrival_time]) rows with one O(n) heapify.
+
+        Saved arrival times are wall-clock timestamps, so pass
+        restore_arrival_times=False when the queue runs on another clock;
+        every row then counts as queued now.
+        """
+        queue = cls(sequence, **options)
+        now = queue.clock()
+        for row in rows:
+            name, priority, arrival_order = row[0], row[1], row[2]
+            if arrival_order in queue._positions:
+                raise ValueError(f"Duplicate arrival order {arrival_order}")
+            # Keep the waiting time already served when the arrival time was saved
+            enqueued_at = now
+            if restore_arrival_times and len(row) > 3 and row[3]:
+                try:
+                    # fromisoformat reads TIMESTAMP_FORMAT about 20x faster than strptime
+                    enqueued_at = datetime.datetime.fromisoformat(row[3]).timestamp()
+                except ValueError:
+                    pass
+            patient = Patient(name, priority, arrival_order, enqueued_at)
+            queue._positions[arrival_order] = len(queue.heap)
+            queue.heap.append(patient)
+            queue._keys.append(queue._key(patient))
+            queue.counter = max(queue.counter, arrival_order + 1)
+        for index in reversed(range(len(queue.heap) // 2)):
+            queue._heapify_down(index)
+        return queue
+
+    def __contains__(self, handle):
+        return handle in self._positions
+
+    contains = __contains__
 
     def insert(self, name, priority):
-        patient = Patient(name, priority, self.counter)
-        self.counter += 1
+        """ Queue a patient and return its handle """
+        arrival_order = self.sequence() if self.sequence else self.counter
+        if arrival_order in self._positions:
+            raise ValueError(f"Duplicate arrival order {arrival_order}")
+        patient = Patient(name, priority, arrival_order, self.clock())
+        self._push(patient)
+        return patient.arrival_order
+
+    def restore(self, patient):
+        """ Put back a patient taken out earlier, keeping their handle and waiting time """
+        if patient.arrival_order in self._positions:
+            raise ValueError(f"Duplicate arrival order {patient.arrival_order}")
+        self._push(patient)
+
+    def _push(self, patient):
         self.heap.append(patient)
+        self._keys.append(self._key(patient))
+        self._positions[patient.arrival_order] = len(self.heap) - 1
+        self.counter = max(self.counter, patient.arrival_order + 1)
         self._heapify_up(len(self.heap) - 1)  # fix the heap from the new position
 
     def remove_highest_priority(self):
         if not self.heap:
             return None
-        self._swap(0, len(self.heap) - 1)  # swap root with the last item
-        highest = self.heap.pop()
-        self._heapify_down(0)  # fix the heap from the root down
-        return highest
+        patient = self._remove_at(0)
+        self._record_wait(patient)
+        return patient
+
+    def update_priority(self, handle, new_priority):
+        """ Re-rank a queued patient in O(log n). Returns False if not queued """
+        index = self._positions.get(handle)
+        if index is None:
+            return False
+        self.heap[index].priority = new_priority
+        self._keys[index] = self._key(self.heap[index])
+        self._heapify_up(index)
+        self._heapify_down(self._positions[handle])
+        return True
+
+    def remove(self, handle):
+        """ Take a patient out of the queue in O(log n), e.g. when they leave """
+        index = self._positions.get(handle)
+        if index is None:
+            return None
+        return self._remove_at(index)
+
+    def effective_priority(self, patient):
+        """ Priority after aging credit; long waits can take it below 1, as in the heap order """
+        if not self.aging_interval:
+            return patient.priority
+        waited = self.clock() - patient.enqueued_at
+        return patient.priority - waited / self.aging_interval
+
+    def wait_stats(self):
+        """ Per priority level: patients served, mean and longest wait in seconds """
+        return {
+            priority: {"served": served, "mean_wait": total / served, "max_wait": longest}
+            for priority, (served, total, longest) in sorted(self._wait_stats.items())
+        }
+
+    def _record_wait(self, patient):
+        waited = self.clock() - patient.enqueued_at
+        stats = self._wait_stats.setdefault(patient.priority, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += waited
+        stats[2] = max(stats[2], waited)
+
+    def _remove_at(self, index):
+        last = self.heap.pop()
+        last_key = self._keys.pop()
+        if index == len(self.heap):
+            del self._positions[last.arrival_order]
+            return last
+        removed = self.heap[index]
+        del self._positions[removed.arrival_order]
+        self.heap[index] = last  # move the last item into the gap
+        self._keys[index] = last_key
+        self._positions[last.arrival_order] = index
+        self._heapify_up(index)
+        self._heapify_down(self._positions[last.arrival_order])  # fix the heap from there down
+        return removed
+
+    def peek(self):
+        """ Next patient to be served, without removing them """
+        return self.heap[0] if self.heap else None
+
+    def head_key(self):
+        """ Sort key of the next patient, for comparing heads of several queues """
+        return self._keys[0] if self._keys else None
+
+    def iter_priority_order(self):
+        """ Lazily yield patients in serving order without copying or sorting the heap.
+
+        A small side heap holds the frontier of heap indices: each step pops
+        the best one and pushes its two children, so the first k patients cost
+        O(k log k). Do not modify the queue while iterating.
+        """
+        if not self.heap:
+            return
+        keys = self._keys
+        size = len(keys)
+        frontier = [(keys[0], 0)]
+        while frontier:
+            _, index = heapq.heappop(frontier)
+            yield self.heap[index]
+            child = 2 * index + 1
+            if child < size:
+                heapq.heappush(frontier, (keys[child], child))
+                if child + 1 < size:
+                    heapq.heappush(frontier, (keys[child + 1], child + 1))
+
+    def top_k(self, k):
+        """ The k next patients in serving order, in O(k log k) """
+        return list(islice(self.iter_priority_order(), k))
 
     def is_empty(self):
         return len(self.heap) == 0
@@ -44,24 +214,37 @@ class PriorityQueue:
         return [str(p) for p in self.heap]
 
     def _heapify_up(self, index):
-        parent = (index - 1) // 2
-        if index > 0 and self.heap[index] < self.heap[parent]:
-            self._swap(index, parent)
-            self._heapify_up(parent)  # recursive
+        # Iterative sift: parents move down into the hole until the item fits
+        heap, keys, positions = self.heap, self._keys, self._positions
+        item, key = heap[index], keys[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not key < keys[parent]:
+                break
+            heap[index] = heap[parent]
+            keys[index] = keys[parent]
+            positions[keys[index][1]] = index
+            index = parent
+        heap[index] = item
+        keys[index] = key
+        positions[key[1]] = index
 
     def _heapify_down(self, index):
-        smallest = index
-        left = 2 * index + 1
-        right = 2 * index + 2
-
-        if left < len(self.heap) and self.heap[left] < self.heap[smallest]:
-            smallest = left
-        if right < len(self.heap) and self.heap[right] < self.heap[smallest]:
-            smallest = right
-
-        if smallest != index:
-            self._swap(index, smallest)
-            self._heapify_down(smallest)
-
-    def _swap(self, i, j):
-        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
+        heap, keys, positions = self.heap, self._keys, self._positions
+        size = len(keys)
+        item, key = heap[index], keys[index]
+        child = 2 * index + 1
+        while child < size:
+            right = child + 1
+            if right < size and keys[right] < keys[child]:
+                child = right
+            if not keys[child] < key:
+                break
+            heap[index] = heap[child]
+            keys[index] = keys[child]
+            positions[keys[index][1]] = index
+            index = child
+            child = 2 * index + 1
+        heap[index] = item
+        keys[index] = key
+        positions[key[1]] = index
@@ -1,34 +1,101 @@
-class Node:
-    def __init__(self,patient_data):
-        self.data=patient_data
-        self.next=None
+import datetime
+
+# Same format the UI has always shown next to each queued patient
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 
 class AppointmentQueue:
-    def __init__(self):
-        self.front=self.rear=None
+    # FIFO of (patient, timestamp) entries in a growable ring buffer: enqueue,
+    # dequeue and len are O(1) and iterating does not copy the queue
+
+    def __init__(self, capacity=8):
+        self.initial_capacity = capacity
+        self._names = [None] * capacity
+        self._times = [None] * capacity
+        self._head = 0   # index of the front entry
+        self._size = 0
+        self._changes = 0  # lets iterators notice the queue changing under them
+
+    @classmethod
+    def from_entries(cls, entries):
+        # Rebuild a queue from (patient, timestamp) pairs in arrival order, e.g.
+        # rows read back from the appointments table, without regrowing
+        entries = list(entries)
+        capacity = 8
+        while capacity < len(entries):
+            capacity *= 2
+        queue = cls(capacity)
+        for i, (name, timestamp) in enumerate(entries):
+            queue._names[i] = name
+            queue._times[i] = timestamp
+        queue._size = len(entries)
+        queue.initial_capacity = 8
+        return queue
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return self.entries()
+
+    def _resize(self, capacity):
+        names = [None] * capacity
+        times = [None] * capacity
+        for i in range(self._size):
+            j = (self._head + i) % len(self._names)
+            names[i] = self._names[j]
+            times[i] = self._times[j]
+        self._names, self._times = names, times
+        self._head = 0
 
-    def enqueue(self,patient_data):
-        new_node=Node(patient_data)
-        if self.rear is None:
-            self.front=self.rear=new_node
-        else:
-            self.rear.next=new_node
-            self.rear=new_node
+    def enqueue(self, patient_data, timestamp=None):
+        if self._size == len(self._names):
+            self._resize(2 * len(self._names))
+        if timestamp is None:
+            timestamp = datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
+        tail = (self._head + self._size) % len(self._names)
+        self._names[tail] = patient_data
+        self._times[tail] = timestamp
+        self._size += 1
+        self._changes += 1
+        return timestamp
 
     def dequeue(self):
-        if self.front is None:
+        entry = self.dequeue_entry()
+        return entry[0] if entry else None
+
+    def dequeue_entry(self):
+        if self._size == 0:
+            return None
+        entry = (self._names[self._head], self._times[self._head])
+        self._names[self._head] = self._times[self._head] = None
+        self._head = (self._head + 1) % len(self._names)
+        self._size -= 1
+        self._changes += 1
+        # Give memory back after a rush, without thrashing around the boundary
+        if self._size < len(self._names) // 4 and len(self._names) > self.initial_capacity:
+            self._resize(max(self.initial_capacity, len(self._names) // 2))
+        return entry
+
+    def peek(self):
+        if self._size == 0:
             return None
-        removed=self.front.data
-        self.front=self.front.next
-        if self.front is None:
-            self.rear=None
-        return removed
+        return self._names[self._head], self._times[self._head]
+
+    def entries(self, start=0, count=None):
+        # Yields (patient, timestamp) from position start, at most count of them
+        end = self._size if count is None else min(self._size, start + count)
+        changes = self._changes
+        capacity = len(self._names)
+        for i in range(max(start, 0), end):
+            if changes != self._changes:
+                raise RuntimeError("AppointmentQueue changed during iteration")
+            j = (self._head + i) % capacity
+            yield self._names[j], self._times[j]
+
+    def window(self, start, count):
+        # One page of the queue, e.g. the rows currently visible in the UI
+        return list(self.entries(start, count))
 
     def viewQueue(self):
-        appointments=[]
-        current= self.front
-        while current:
-            appointments.append(current.data)
-            current=current.next
-        return appointments
\ No newline at end of file
+        return [name for name, _ in self.entries()]
@@ -0,0 +1,91 @@
+import datetime
+import unittest
+
+from ..ds.appointment_slots import SlotScheduler
+from ..ds.queue_appointments import AppointmentQueue
+
+
+def at(hour, minute=0):
+    return datetime.datetime(2025, 7, 10, hour, minute)
+
+
+class TestSlotScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.slots = SlotScheduler()
+        self.slots.book("Dr Otieno", "Mark", at(9), 30)
+        self.slots.book("Dr Otieno", "David", at(9, 45))
+        self.slots.book("Dr Wanjiru", "Aisha", at(10), 60)
+
+    def test_overlapping_booking_is_rejected(self):
+        """Test a doctor cannot be double booked"""
+        with self.assertRaises(ValueError):
+            self.slots.book("Dr Otieno", "Lena", at(9, 15))
+        with self.assertRaises(ValueError):
+            self.slots.book("Dr Otieno", "Lena", at(9, 40))
+        # Back to back is fine, and other doctors are unaffected
+        self.slots.book("Dr Otieno", "Lena", at(9, 30))
+        self.slots.book("Dr Wanjiru", "Lena", at(9))
+        self.assertEqual(len(self.slots), 5)
+
+    def test_next_free_slot(self):
+        """Test the search skips over bookings and gaps that are too short"""
+        self.assertEqual(self.slots.next_free_slot("Dr Otieno", at(9)), at(9, 30))
+        self.assertEqual(self.slots.next_free_slot("Dr Otieno", at(9), 30), at(10))
+        self.assertEqual(self.slots.next_free_slot("Dr Otieno", at(9, 50)), at(10))
+        self.assertEqual(self.slots.next_free_slot("Dr Otieno", at(8, 52)), at(9, 30))
+        self.assertEqual(self.slots.next_free_slot("Dr Kamau", at(8, 1)), at(8, 15))
+        self.assertIsNone(self.slots.next_free_slot("Dr Wanjiru", at(10), until=at(11)))
+
+    def test_booked_between(self):
+        """Test the hospital-wide range query includes long bookings that started earlier"""
+        names = [b.patient for b in self.slots.booked_between(at(10, 30), at(11))]
+        self.assertEqual(names, ["Aisha"])
+        names = [b.patient for b in self.slots.booked_between(at(9, 15), at(10, 15))]
+        self.assertEqual(names, ["Mark", "David", "Aisha"])
+        self.assertEqual(self.slots.booked_between(at(11), at(12)), [])
+
+    def test_booked_between_with_one_long_booking(self):
+        """Test an all-day booking does not disturb window queries among many short ones"""
+        slots = SlotScheduler()
+        slots.book("Dr Kamau", "Theatre", at(0), 24 * 60)
+        everyone = [slots.book(f"Dr {i}", f"P{i}-{slot}", at(8) + slot * slots.slot)
+                    for i in range(20) for slot in range(32)]
+        everyone.append(slots.book("Dr Otieno", "Long", at(9), 90))
+
+        for start, end in [(at(10), at(10, 30)), (at(10, 7), at(10, 8)), (at(9, 45), at(11)), (at(16), at(17))]:
+            expected = sorted((b for b in everyone + [slots.bookings_for("Dr Kamau")[0]]
+                               if b.start < end and b.end > start), key=lambda b: (b.start, b.seq))
+            self.assertEqual(slots.booked_between(start, end), expected)
+        self.assertEqual(len(slots.booked_between(at(10), at(10, 15))), 20 + 2)
+
+        slots.cancel(slots.bookings_for("Dr Kamau")[0])
+        self.assertEqual([b.patient for b in slots.booked_between(at(16), at(17))], [])
+        self.assertEqual(len(slots), 20 * 32 + 1)
+
+    def test_cancel(self):
+        """Test cancelling frees the slot and shrinks the search window"""
+        aisha = self.slots.booked_between(at(10), at(11))[0]
+        self.assertTrue(self.slots.cancel(aisha))
+        self.assertFalse(self.slots.cancel(aisha))
+        self.assertTrue(self.slots.is_free("Dr Wanjiru", at(10), 60))
+        self.assertEqual(self.slots.booked_between(at(10), at(11)), [])
+        self.assertEqual(self.slots.doctors_free(at(9, 15)), ["Dr Wanjiru"])
+
+    def test_bookings_for(self):
+        """Test a doctor's bookings in a window"""
+        names = [b.patient for b in self.slots.bookings_for("Dr Otieno", at(9, 20), at(10))]
+        self.assertEqual(names, ["Mark", "David"])
+        self.assertEqual(self.slots.bookings_for("Dr Otieno", at(10)), [])
+
+    def test_schedule_from_queue_timestamps(self):
+        """Test walk-ins are booked from the timestamps the queue records"""
+        queue = AppointmentQueue()
+        queue.enqueue("Lena", "2025-07-10 09:05:12")
+        queue.enqueue("Omar", "2025-07-10 09:06:40")
+        booked = [self.slots.schedule("Dr Otieno", name, arrived) for name, arrived in queue]
+        self.assertEqual([b.start for b in booked], [at(9, 30), at(10)])
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
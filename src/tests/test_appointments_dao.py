@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ..database import appointments_dao, queue_schema
+from ..database.connection_manager import HOSPITAL_DB, manager
+from ..ds.queue_appointments import AppointmentQueue
+
+
+class TestAppointmentWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.patch = mock.patch.dict(manager.paths, {HOSPITAL_DB: self.db_path})
+        self.patch.start()
+        queue_schema.create_tables()
+        self.now = [0.0]
+        self.store = appointments_dao.AppointmentWriteBehind(batch_size=5, flush_interval=10,
+                                                            clock=lambda: self.now[0])
+
+    def tearDown(self):
+        self.patch.stop()
+        manager.close()
+        os.remove(self.db_path)
+
+    def test_changes_are_buffered_until_a_threshold(self):
+        self.store.record_enqueue("A", "2025-07-10 09:00:00")
+        self.store.record_enqueue("B", "2025-07-10 09:01:00")
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(appointments_dao.load_appointments(), [])
+
+        self.now[0] = 11.0  # time threshold
+        self.store.record_dequeue()
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(appointments_dao.load_appointments(), [("B", "2025-07-10 09:01:00")])
+
+    def test_size_threshold_and_dequeue_coalescing(self):
+        for name in "ABCD":
+            self.store.record_enqueue(name, "t")
+        self.store.record_dequeue()  # fifth change triggers the flush
+        self.assertEqual(self.store.flushes, 1)
+
+        self.store.record_dequeue()
+        self.store.record_dequeue()
+        self.store.record_enqueue("E", "t")
+        self.assertEqual(self.store.close(), 3)
+        self.assertEqual([name for name, _ in appointments_dao.load_appointments()], ["D", "E"])
+        self.assertEqual(self.store.close(), 0)
+
+    def test_restart_restores_queue(self):
+        queue = AppointmentQueue()
+        for name in ["Mark", "David", "Aisha"]:
+            self.store.record_enqueue(name, queue.enqueue(name))
+        queue.dequeue()
+        self.store.record_dequeue()
+        self.store.close()
+
+        restored = AppointmentQueue.from_entries(appointments_dao.load_appointments())
+        self.assertEqual(list(restored), list(queue))
+        restored.enqueue("Lena")
+        self.assertEqual(restored.viewQueue(), ["David", "Aisha", "Lena"])
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -149,5 +149,132 @@ def test_multiple_operations():
     assert len(bst.inorderTraversal()) == 3
 
 
+def test_sorted_inserts_stay_balanced():
+    """Inserting in name order must not degenerate into a linked list"""
+    bst = DoctorBST()
+    for i in range(5000):
+        bst.insertDoctor(Doctor(f"Dr {i:05d}", "General"))
+
+    stats = bst.getBalanceStats()
+    assert stats["size"] == 5000
+    assert stats["max_imbalance"] <= 1
+    assert stats["height"] == bst.getHeight()
+    assert bst.getHeight() <= 18  # 1.44 * log2(5000)
+    assert bst.searchDoctor("Dr 04999").name == "Dr 04999"
+
+
+def test_deletes_keep_tree_balanced():
+    """Deleting half of the doctors keeps the AVL invariant"""
+    bst = DoctorBST()
+    for i in range(1000):
+        bst.insertDoctor(Doctor(f"Dr {i:04d}", "General"))
+    for i in range(0, 1000, 2):
+        bst.deleteDoctor(f"Dr {i:04d}")
+
+    stats = bst.getBalanceStats()
+    assert stats["size"] == 500
+    assert stats["max_imbalance"] <= 1
+    names = [doc.name for doc in bst.inorderTraversal()]
+    assert names == [f"Dr {i:04d}" for i in range(1, 1000, 2)]
+
+
+def test_iter_doctors_forward_reverse_and_start():
+    """The streaming traversal supports reverse order and a start key"""
+    bst = DoctorBST()
+    for name in ["Mike", "Alice", "Zane", "Diana", "Oscar", "Bob"]:
+        bst.insertDoctor(Doctor(name, "General"))
+
+    assert [d.name for d in bst.iterDoctors()] == ["Alice", "Bob", "Diana", "Mike", "Oscar", "Zane"]
+    assert [d.name for d in bst.iterDoctors(reverse=True)] == ["Zane", "Oscar", "Mike", "Diana", "Bob", "Alice"]
+    assert [d.name for d in bst.iterDoctors(start="C")] == ["Diana", "Mike", "Oscar", "Zane"]
+    assert [d.name for d in bst.iterDoctors(start="Mike")] == ["Mike", "Oscar", "Zane"]
+    assert [d.name for d in bst.iterDoctors(start="N", reverse=True)] == ["Mike", "Diana", "Bob", "Alice"]
+    assert list(bst.iterDoctors(start="Zz")) == []
+    assert list(DoctorBST().iterDoctors()) == []
+
+
+def build_roster(names):
+    bst = DoctorBST()
+    for name in names:
+        bst.insertDoctor(Doctor(name, "General"))
+    return bst
+
+
+def test_range_and_prefix_search():
+    """Range queries are inclusive and prefix queries stop at the first non-match"""
+    bst = build_roster(["Mwangi", "Mwai", "Mwakio", "Otieno", "Mbugua", "Njeri", "Mwa"])
+
+    assert [d.name for d in bst.rangeSearch("Mb", "Mwai")] == ["Mbugua", "Mwa", "Mwai"]
+    assert [d.name for d in bst.prefixSearch("Mwa")] == ["Mwa", "Mwai", "Mwakio", "Mwangi"]
+    assert [d.name for d in bst.prefixSearch("Mwa", limit=2)] == ["Mwa", "Mwai"]
+    assert bst.prefixSearch("Z") == []
+
+
+def test_kth_rank_and_pages():
+    """Subtree sizes give k-th doctor, rank and pagination"""
+    names = [f"Dr {i:03d}" for i in range(100)]
+    bst = build_roster(reversed(names))
+    for i in range(0, 100, 2):
+        bst.deleteDoctor(names[i])
+    remaining = names[1::2]
+
+    assert len(bst) == 50
+    assert bst.kthDoctor(0).name == remaining[0]
+    assert bst.kthDoctor(49).name == remaining[49]
+    assert bst.kthDoctor(50) is None
+    assert bst.rankOf(remaining[10]) == 10
+    assert bst.rankOf("Dr 020") == 10  # deleted name, ranks between neighbours
+    assert [d.name for d in bst.getPage(2, 20)] == remaining[40:]
+    assert bst.getPage(3, 20) == []
+
+
+def test_doctors_by_specialty_follows_updates_and_deletes():
+    """The specialty index stays consistent through insert, update and delete"""
+    bst = DoctorBST()
+    bst.insertDoctor(Doctor("Zane", "Cardiology"))
+    bst.insertDoctor(Doctor("Alice", "Cardiology"))
+    bst.insertDoctor(Doctor("Mike", "ENT"))
+    bst.insertDoctor(Doctor("Alice", "Surgery"))  # duplicate name is ignored
+
+    assert [d.name for d in bst.doctorsBySpecialty("cardiology")] == ["Alice", "Zane"]
+
+    bst.updateDoctor("Mike", "Cardiology")
+    assert [d.name for d in bst.doctorsBySpecialty("Cardiology")] == ["Alice", "Mike", "Zane"]
+    assert bst.doctorsBySpecialty("ENT") == []
+
+    bst.deleteDoctor("Alice")
+    bst.deleteDoctor("Nobody")
+    assert [d.name for d in bst.doctorsBySpecialty("Cardiology")] == ["Mike", "Zane"]
+    assert bst.specialties.specialtyCounts() == {"cardiology": 2}
+
+
+def test_from_sorted_builds_balanced_tree():
+    """Bulk build from name-ordered rows gives a minimal-height tree"""
+    doctors = [Doctor(f"Dr {i:04d}", "Cardiology" if i % 3 else "ENT") for i in range(1000)]
+    bst = DoctorBST.fromSorted(doctors)
+
+    stats = bst.getBalanceStats()
+    assert stats == {"size": 1000, "height": 10, "max_imbalance": 1}
+    assert bst.getHeight() == 10
+    assert [d.name for d in bst.inorderTraversal()] == [d.name for d in doctors]
+    assert len(bst.doctorsBySpecialty("ENT")) == 334
+    assert bst.kthDoctor(500).name == "Dr 0500"
+
+    # The tree stays fully usable afterwards
+    bst.insertDoctor(Doctor("Dr 9999", "ENT"))
+    bst.deleteDoctor("Dr 0000")
+    assert bst.getBalanceStats()["max_imbalance"] <= 1
+    assert len(bst.doctorsBySpecialty("ENT")) == 334
+
+
+def test_from_sorted_accepts_unsorted_input():
+    """Unsorted or duplicated input still produces a valid tree"""
+    bst = DoctorBST.fromSorted([Doctor("Mike", "ENT"), Doctor("Alice", "Surgery"), Doctor("Mike", "X")])
+
+    assert [d.name for d in bst.inorderTraversal()] == ["Alice", "Mike"]
+    assert bst.searchDoctor("Mike").specialty == "ENT"
+    assert DoctorBST.fromSorted([]).inorderTraversal() == []
+
+
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
\ No newline at end of file
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,145 @@
+import threading
+import unittest
+from queue import Empty, Full
+
+from ..ds.concurrent_queues import BlockingAppointmentQueue, BlockingPriorityQueue, QueueClosed
+
+
+class TestBlockingPriorityQueue(unittest.TestCase):
+
+    def test_get_returns_highest_priority_first(self):
+        q = BlockingPriorityQueue()
+        q.put("Minor", 4)
+        q.put_many([("Urgent", 1), ("Moderate", 3)])
+        self.assertEqual([q.get().name for _ in range(3)], ["Urgent", "Moderate", "Minor"])
+
+    def test_timeouts(self):
+        q = BlockingPriorityQueue(maxsize=1)
+        with self.assertRaises(Empty):
+            q.get(timeout=0.01)
+        with self.assertRaises(Empty):
+            q.get(block=False)
+        q.put("A", 1)
+        with self.assertRaises(Full):
+            q.put("B", 1, timeout=0.01)
+        with self.assertRaises(ValueError):
+            q.put_many([("B", 1), ("C", 1)])
+
+    def test_blocked_consumer_wakes_on_put(self):
+        q = BlockingPriorityQueue()
+        result = []
+        consumer = threading.Thread(target=lambda: result.append(q.get(timeout=5)))
+        consumer.start()
+        q.put("Late", 2)
+        consumer.join(5)
+        self.assertEqual(result[0].name, "Late")
+
+    def test_close_lets_consumers_drain_then_stops_them(self):
+        q = BlockingPriorityQueue()
+        q.put_many([("A", 2), ("B", 1), ("C", 3)])
+        q.close()
+        with self.assertRaises(QueueClosed):
+            q.put("D", 1)
+        self.assertEqual([p.name for p in q.pop_many(2)], ["B", "A"])
+        self.assertEqual([p.name for p in q.drain()], ["C"])
+        with self.assertRaises(QueueClosed):
+            q.get(timeout=1)
+
+    def test_many_producers_and_consumers_lose_nothing(self):
+        q = BlockingPriorityQueue(maxsize=50)
+        served = []
+        lock = threading.Lock()
+
+        def produce(worker):
+            for i in range(0, 500, 10):
+                q.put_many((f"{worker}-{i + j}", (i + j) % 5 + 1) for j in range(10))
+
+        def consume():
+            while True:
+                try:
+                    batch = q.pop_many(7)
+                except QueueClosed:
+                    return
+                with lock:
+                    served.extend(p.name for p in batch)
+
+        producers = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+        consumers = [threading.Thread(target=consume) for _ in range(3)]
+        for thread in producers + consumers:
+            thread.start()
+        for thread in producers:
+            thread.join()
+        q.close()
+        for thread in consumers:
+            thread.join()
+
+        self.assertEqual(len(served), 2000)
+        self.assertEqual(len(set(served)), 2000)
+
+
+class TestBlockingAppointmentQueue(unittest.TestCase):
+
+    def test_fifo_order_and_batches(self):
+        q = BlockingAppointmentQueue()
+        q.put("Mark")
+        q.put_many(["David", "Aisha", "Lena"])
+        self.assertEqual(len(q), 4)
+        self.assertEqual(q.get(), "Mark")
+        self.assertEqual(q.pop_many(2), ["David", "Aisha"])
+        self.assertEqual(q.drain(), ["Lena"])
+        with self.assertRaises(Empty):
+            q.get(block=False)
+
+    def test_bounded_put_waits_for_room(self):
+        q = BlockingAppointmentQueue(maxsize=2)
+        q.put_many(["A", "B"])
+        with self.assertRaises(Full):
+            q.put("C", timeout=0.01)
+
+        producer = threading.Thread(target=q.put, args=("C", 5))
+        producer.start()
+        self.assertEqual(q.get(), "A")
+        producer.join(5)
+        self.assertEqual(q.drain(), ["B", "C"])
+
+    def test_close_protocol(self):
+        q = BlockingAppointmentQueue()
+        q.put("A")
+        q.close()
+        with self.assertRaises(QueueClosed):
+            q.put("B")
+        self.assertEqual(q.get(), "A")
+        with self.assertRaises(QueueClosed):
+            q.get(timeout=1)
+
+    def test_concurrent_fifo_per_producer(self):
+        q = BlockingAppointmentQueue(maxsize=64)
+        served = []
+
+        def produce(worker):
+            for i in range(0, 1000, 5):
+                q.put_many((worker, i + j) for j in range(5))
+
+        def consume():
+            while True:
+                try:
+                    served.extend(q.pop_many(16))
+                except QueueClosed:
+                    return
+
+        producers = [threading.Thread(target=produce, args=(w,)) for w in range(3)]
+        consumer = threading.Thread(target=consume)
+        for thread in producers + [consumer]:
+            thread.start()
+        for thread in producers:
+            thread.join()
+        q.close()
+        consumer.join()
+
+        self.assertEqual(len(served), 3000)
+        for worker in range(3):
+            self.assertEqual([i for w, i in served if w == worker], list(range(1000)))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from ..database.connection_manager import ROOT_DIR, ConnectionManager
+
+
+class TestConnectionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.manager = ConnectionManager(root_dir=self.dir.name)
+        with self.manager.transaction("test.db") as conn:
+            conn.execute("CREATE TABLE items (name TEXT)")
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.dir.cleanup()
+
+    def names(self):
+        return [row[0] for row in self.manager.connection("test.db").execute("SELECT name FROM items ORDER BY rowid")]
+
+    def test_connections_are_reused_per_thread(self):
+        """Test one thread gets the same connection back and another thread gets its own"""
+        conn = self.manager.connection("test.db")
+        self.assertIs(self.manager.connection("test.db"), conn)
+        self.assertIsNot(self.manager.connection("other.db"), conn)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.manager.connection("test.db")))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+
+    def test_pragmas(self):
+        """Test connections are opened in WAL mode with relaxed syncing"""
+        conn = self.manager.connection("test.db")
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)   # MEMORY
+
+    def test_paths_resolve_from_the_root(self):
+        """Test relative names do not depend on the working directory"""
+        self.assertEqual(self.manager.db_path("test.db"), os.path.join(self.dir.name, "test.db"))
+        self.assertEqual(ConnectionManager().db_path("hospital.db"), os.path.join(ROOT_DIR, "hospital.db"))
+        self.manager.paths["alias"] = "test.db"
+        self.assertIs(self.manager.connection("alias"), self.manager.connection("test.db"))
+
+    def test_nested_transaction_rolls_back_to_savepoint(self):
+        """Test an inner failure only undoes the inner block"""
+        with self.manager.transaction("test.db") as conn:
+            conn.execute("INSERT INTO items VALUES ('outer')")
+            with self.assertRaises(ValueError):
+                with self.manager.transaction("test.db") as inner:
+                    inner.execute("INSERT INTO items VALUES ('inner')")
+                    raise ValueError
+            with self.manager.transaction("test.db") as inner:
+                inner.execute("INSERT INTO items VALUES ('kept')")
+        self.assertEqual(self.names(), ["outer", "kept"])
+
+    def test_outer_failure_rolls_everything_back(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.manager.transaction("test.db") as conn:
+                conn.execute("INSERT INTO items VALUES ('lost')")
+                conn.execute("CREATE TABLE items (name TEXT)")
+        self.assertEqual(self.names(), [])
+        self.assertFalse(self.manager.connection("test.db").in_transaction)
+
+    def test_closed_connection_is_reopened(self):
+        """Test a connection closed behind the manager's back is replaced"""
+        conn = self.manager.connection("test.db")
+        conn.close()
+        reopened = self.manager.connection("test.db")
+        self.assertIsNot(reopened, conn)
+        with self.manager.transaction("test.db") as conn:
+            conn.execute("INSERT INTO items VALUES ('after')")
+        self.assertEqual(self.names(), ["after"])
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,76 @@
+import unittest
+
+from ..ds.department_queues import DepartmentQueues
+
+
+class TestDepartmentQueues(unittest.TestCase):
+
+    def setUp(self):
+        self.depts = DepartmentQueues()
+        self.depts.add_department("ER", weight=2)
+        self.depts.add_department("Pediatrics")
+        self.depts.add_department("Maternity")
+
+    def test_serve_next_is_most_urgent_across_departments(self):
+        """The global view merges the department heads."""
+        self.depts.insert("ER", "E1", 3)
+        self.depts.insert("Pediatrics", "P1", 1)
+        self.depts.insert("Maternity", "M1", 1)
+        self.depts.insert("ER", "E2", 2)
+
+        self.assertEqual(self.depts.peek_next()[1].name, "P1")
+        served = [self.depts.serve_next() for _ in range(4)]
+        self.assertEqual([(d, p.name) for d, p in served],
+                         [("Pediatrics", "P1"), ("Maternity", "M1"), ("ER", "E2"), ("ER", "E1")])
+        self.assertIsNone(self.depts.serve_next())
+        self.assertIsNone(self.depts.peek_next())
+
+    def test_global_view_follows_updates_and_removals(self):
+        a = self.depts.insert("ER", "A", 3)
+        b = self.depts.insert("Pediatrics", "B", 2)
+        self.depts.update_priority("ER", a, 1)
+        self.assertEqual(self.depts.peek_next()[1].name, "A")
+
+        self.depts.remove("ER", a)
+        self.assertEqual(self.depts.peek_next()[1].name, "B")
+        self.assertEqual(self.depts.sizes(), {"ER": 0, "Pediatrics": 1, "Maternity": 0})
+        self.assertEqual(len(self.depts), 1)
+        self.assertEqual(b, 1)  # handles come from one shared sequence
+
+    def test_dispatch_shares_by_weight(self):
+        """ER (weight 2) gets twice the clinician picks while everyone is busy."""
+        for i in range(30):
+            self.depts.insert("ER", f"E{i}", 3)
+            self.depts.insert("Pediatrics", f"P{i}", 1)
+
+        picks = [self.depts.dispatch()[0] for _ in range(30)]
+        self.assertEqual(picks.count("ER"), 20)
+        self.assertEqual(picks.count("Pediatrics"), 10)
+
+    def test_dispatch_skips_empty_and_idle_departments_get_no_backlog_credit(self):
+        for i in range(10):
+            self.depts.insert("ER", f"E{i}", 3)
+        for _ in range(6):
+            self.assertEqual(self.depts.dispatch()[0], "ER")
+
+        # Maternity was idle; it joins at the current virtual time instead of
+        # getting a burst of turns for the time it had no patients
+        for i in range(4):
+            self.depts.insert("Maternity", f"M{i}", 3)
+        picks = [self.depts.dispatch()[0] for _ in range(6)]
+        self.assertEqual(picks.count("Maternity"), 2)
+        self.assertEqual(picks.count("ER"), 4)
+
+        remaining = [self.depts.dispatch() for _ in range(2)]
+        self.assertTrue(all(pick[0] == "Maternity" for pick in remaining))
+        self.assertIsNone(self.depts.dispatch())
+
+    def test_unknown_department_and_bad_weight(self):
+        with self.assertRaises(KeyError):
+            self.depts.insert("Radiology", "X", 1)
+        with self.assertRaises(ValueError):
+            self.depts.set_weight("ER", 0)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
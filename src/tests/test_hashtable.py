@@ -1,14 +1,21 @@
 import sys
 import os
+import tracemalloc
 import pytest
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ds')))
 
-from ..ds.hashtable_patients import HashTable, Patient
+from ..ds.hashtable_patients import (
+    CompactHashTable,
+    HashTable,
+    Patient,
+    PatientRecord,
+    create_patient_table,
+)
 
-@pytest.fixture
-def hashtable():
-    ht = HashTable()
+@pytest.fixture(params=["chaining", "open"])
+def hashtable(request):
+    ht = create_patient_table(backend=request.param)
     return ht
 
 def test_add_patient_success(hashtable):
@@ -54,4 +61,154 @@ def test_get_all_patients(hashtable):
     all_patients = hashtable.getPatients()
     assert len(all_patients) == 2
     patient_ids = [patient.id for patient in all_patients]
-    assert "4" in patient_ids and "5" in patient_ids
\ No newline at end of file
+    assert "4" in patient_ids and "5" in patient_ids
+
+def test_table_grows_and_keeps_patients(hashtable):
+    for i in range(1000):
+        assert hashtable.addPatient(Patient(str(i), f"P{i}", 30, "Flu"))
+
+    assert len(hashtable) == 1000
+    assert hashtable.getResizeCount() > 0
+    assert hashtable.getLoadFactor() <= HashTable.MAX_LOAD_FACTOR
+    for i in range(1000):
+        assert hashtable.getPatient(str(i)).name == f"P{i}"
+    assert len(hashtable.getPatients()) == 1000
+
+
+def test_incremental_rehash_moves_a_few_buckets_per_operation():
+    ht = HashTable(size=8)
+    for i in range(7):
+        ht.addPatient(Patient(str(i), f"P{i}", 30, "Flu"))
+
+    assert ht.isRehashing()
+    # Entries still in the old table are found and duplicates are still rejected
+    for i in range(7):
+        assert ht.getPatient(str(i)) is not None
+    assert ht.addPatient(Patient("0", "Dup", 1, "Cold")) is False
+    assert not ht.isRehashing()
+
+
+def test_table_shrinks_after_removals(hashtable):
+    for i in range(500):
+        hashtable.addPatient(Patient(str(i), f"P{i}", 30, "Flu"))
+    grown = hashtable.size
+    for i in range(495):
+        assert hashtable.removePatient(str(i))
+
+    assert hashtable.size < grown
+    assert hashtable.size >= hashtable.initial_size
+    assert sorted(p.id for p in hashtable.getPatients()) == ["495", "496", "497", "498", "499"]
+
+
+def test_bucket_histogram_counts_every_patient():
+    hashtable = HashTable()
+    for i in range(100):
+        hashtable.addPatient(Patient(str(i), f"P{i}", 30, "Flu"))
+
+    histogram = hashtable.getBucketHistogram()
+    assert sum(length * buckets for length, buckets in histogram.items()) == 100
+    assert max(histogram) <= 10
+
+
+def test_create_patient_table_backends():
+    assert isinstance(create_patient_table(), HashTable)
+    assert isinstance(create_patient_table(backend="open"), CompactHashTable)
+    with pytest.raises(ValueError):
+        create_patient_table(backend="btree")
+
+
+def test_compact_table_survives_mixed_operations():
+    ht = CompactHashTable()
+    expected = {}
+    for i in range(3000):
+        key = str((i * 7919) % 1000)
+        if i % 3 == 2:
+            assert ht.removePatient(key) == (key in expected)
+            expected.pop(key, None)
+        else:
+            assert ht.addPatient(PatientRecord(key, "N", 40, "Flu")) == (key not in expected)
+            expected.setdefault(key, True)
+
+    assert len(ht) == len(expected)
+    assert sorted(p.id for p in ht.getPatients()) == sorted(expected)
+    for key in expected:
+        assert ht.getPatient(key).id == key
+
+
+def test_compact_table_uses_much_less_memory():
+    rows = [(f"P{i:05d}", f"Name {i}", 20 + i % 60, "Flu") for i in range(20000)]
+
+    def measure(table, record):
+        tracemalloc.start()
+        for row in rows:
+            table.addPatient(record(*row))
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return used
+
+    assert not hasattr(PatientRecord(*rows[0]), "__dict__")
+    chaining = measure(HashTable(), Patient)
+    compact = measure(CompactHashTable(), PatientRecord)
+    assert compact < chaining * 0.5
+
+
+def test_compact_histogram_reports_probe_distances():
+    ht = CompactHashTable()
+    for i in range(100):
+        ht.addPatient(PatientRecord(str(i), "N", 40, "Flu"))
+
+    histogram = ht.getBucketHistogram()
+    assert sum(histogram.values()) == 100
+    assert ht.getLoadFactor() <= CompactHashTable.MAX_LOAD_FACTOR
+
+
+def test_patients_by_condition(hashtable):
+    hashtable.addPatient(Patient("1", "Alice", 61, "Diabetes"))
+    hashtable.addPatient(Patient("2", "Bob", 45, "diabetes "))
+    hashtable.addPatient(Patient("3", "Carol", 70, "Asthma"))
+
+    assert sorted(p.id for p in hashtable.getPatientsByCondition("Diabetes")) == ["1", "2"]
+    assert hashtable.getPatientsByCondition("Cancer") == []
+
+    hashtable.removePatient("1")
+    assert [p.id for p in hashtable.getPatientsByCondition("diabetes")] == ["2"]
+
+
+def test_patients_by_age_range(hashtable):
+    for i, age in enumerate([15, 60, 72, "80", 81, "unknown"]):
+        hashtable.addPatient(Patient(str(i), f"P{i}", age, "Flu"))
+
+    assert sorted(p.id for p in hashtable.getPatientsByAgeRange(60, 80)) == ["1", "2", "3"]
+
+    hashtable.removePatient("2")
+    assert sorted(p.id for p in hashtable.getPatientsByAgeRange(60, 80)) == ["1", "3"]
+    assert hashtable.getPatientsByAgeRange(90, 120) == []
+    # Bounds typed into the UI arrive as strings
+    assert sorted(p.id for p in hashtable.getPatientsByAgeRange("60", 80)) == ["1", "3"]
+    assert sorted(p.id for p in hashtable.getPatientsByAgeRange(60, " 80 ")) == ["1", "3"]
+    with pytest.raises(ValueError):
+        hashtable.getPatientsByAgeRange("old", 80)
+
+
+def test_bulk_load_presized(hashtable):
+    hashtable.reserve(5000)
+    resizes = hashtable.getResizeCount()
+    rows = ((str(i), f"P{i}", i % 90, "Flu" if i % 2 else "Asthma") for i in range(5000))
+
+    added = hashtable.bulkLoad((Patient(*row) for row in rows), check_duplicates=False)
+
+    assert added == 5000
+    assert len(hashtable) == 5000
+    assert hashtable.getResizeCount() == resizes
+    assert hashtable.getPatient("4321").name == "P4321"
+    assert len(hashtable.getPatientsByCondition("asthma")) == 2500
+    assert len(hashtable.getPatientsByAgeRange(10, 19)) == 560
+
+
+def test_bulk_load_skips_duplicates_when_checking(hashtable):
+    hashtable.addPatient(Patient("1", "Alice", 30, "Flu"))
+    patients = [Patient("1", "Other", 40, "Cold"), Patient("2", "Bob", 50, "Cold")]
+
+    assert hashtable.bulkLoad(patients) == 1
+    assert hashtable.getPatient("1").name == "Alice"
+    assert len(hashtable) == 2
@@ -0,0 +1,49 @@
+import unittest
+
+from ..ds.lru_cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        """Test a read refreshes an entry so the other one is evicted"""
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 0, 1))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.misses, 1)
+
+    def test_byte_budget(self):
+        """Test entries are evicted until the total size fits"""
+        cache = LRUCache(max_bytes=10, sizeof=len)
+        cache.put("a", "xxxx")
+        cache.put("b", "yyyy")
+        cache.put("c", "zzzz")
+        self.assertEqual((len(cache), cache.bytes), (2, 8))
+        self.assertNotIn("a", cache)
+        # An entry bigger than the whole budget is not cached at all
+        self.assertFalse(cache.put("d", "x" * 11))
+        self.assertEqual(cache.bytes, 8)
+
+    def test_put_replaces_and_invalidate(self):
+        """Test re-putting a key re-weighs it and invalidate frees its size"""
+        cache = LRUCache(max_bytes=10, sizeof=len)
+        cache.put("a", "xx")
+        cache.put("a", "xxxxx")
+        self.assertEqual(cache.bytes, 5)
+        self.assertEqual(cache.peek("a"), "xxxxx")
+        self.assertTrue(cache.invalidate("a"))
+        self.assertFalse(cache.invalidate("a"))
+        self.assertEqual((len(cache), cache.bytes, cache.hits), (0, 0, 0))
+
+    def test_needs_a_bound(self):
+        with self.assertRaises(ValueError):
+            LRUCache()
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,153 @@
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from ..database.connection_manager import HOSPITAL_DB, manager
+from ..ds.LinkedList_medication import MedicationHistory
+
+
+class TestMedicationHistory(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE medication_history (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "patient_id TEXT, med_name TEXT, dosage TEXT, date TEXT)")
+        conn.executemany("INSERT INTO medication_history(patient_id, med_name, dosage, date) VALUES (?, ?, ?, ?)",
+                         [("P001", "Paracetamol", "500mg", "2025-07-10"),
+                          ("P002", "Amoxicillin", "250mg", "2025-07-11"),
+                          ("P001", "Ibuprofen", "200mg", "2025-07-12")])
+        conn.commit()
+        conn.close()
+        self.patch = mock.patch.dict(manager.paths, {HOSPITAL_DB: self.db_path})
+        self.patch.start()
+        self.history = MedicationHistory()
+
+    def tearDown(self):
+        self.patch.stop()
+        manager.close()
+        os.remove(self.db_path)
+
+    def test_history_is_loaded_lazily_per_patient(self):
+        """Test a patient's list is read from the database on first access only"""
+        self.assertEqual(len(self.history.patients), 0)
+        self.assertEqual([m[0] for m in self.history.medications("P001")], ["Paracetamol", "Ibuprofen"])
+        self.assertIn("P001", self.history.patients)
+        self.assertNotIn("P002", self.history.patients)
+
+    def test_add_appends_to_loaded_patient(self):
+        """Test appends go to the tail of a loaded list and straight to the database otherwise"""
+        self.history.medications("P001")
+        self.history.add_medication("P001", "Cetirizine", "10mg", "2025-07-13")
+        self.history.add_medication("P002", "Metformin", "500mg", "2025-07-13")
+        self.assertNotIn("P002", self.history.patients)
+
+        p001 = self.history.patients.peek("P001")
+        self.assertEqual(p001.tail.med_name, "Cetirizine")
+        self.assertEqual(self.history.count("P001"), 3)
+        self.assertEqual([m[0] for m in self.history.medications("P002")], ["Amoxicillin", "Metformin"])
+
+    def test_delete_is_scoped_to_the_patient(self):
+        """Test delete removes every matching dose for that patient only"""
+        self.history.add_medication("P001", "Paracetamol", "1g", "2025-07-14")
+        self.history.add_medication("P002", "Paracetamol", "500mg", "2025-07-14")
+        self.history.medications("P001")
+
+        self.assertEqual(self.history.delete_medication("P001", "Paracetamol"), 2)
+        self.assertEqual(self.history.medications("P001"), [("Ibuprofen", "200mg", "2025-07-12")])
+        self.assertEqual(self.history.patients.peek("P001").tail.med_name, "Ibuprofen")
+        self.assertEqual([m[0] for m in self.history.medications("P002")], ["Amoxicillin", "Paracetamol"])
+
+        # A fresh instance reads the same state back from the database
+        self.assertEqual(MedicationHistory().medications("P001"), self.history.medications("P001"))
+
+    def test_repeat_reads_are_cache_hits(self):
+        """Test reopening a chart is served from the cache"""
+        self.history.show_medication_history("P001")
+        self.history.show_medication_history("P001")
+        self.history.add_medication("P001", "Cetirizine", "10mg", "2025-07-13")
+        rows = self.history.show_medication_history("P001")
+        self.assertEqual(rows[-1][1], "Cetirizine")
+        stats = self.history.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_invalidate_rereads_the_table(self):
+        """Test invalidate picks up rows written by someone else"""
+        self.history.medications("P002")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO medication_history(patient_id, med_name, dosage, date) "
+                     "VALUES ('P002', 'Metformin', '500mg', '2025-07-13')")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.history.count("P002"), 1)
+        self.history.invalidate("P002")
+        self.assertEqual(self.history.count("P002"), 2)
+
+    def test_cache_is_bounded(self):
+        """Test the least recently used patient is evicted"""
+        history = MedicationHistory(max_patients=1)
+        history.medications("P001")
+        history.medications("P002")
+        self.assertNotIn("P001", history.patients)
+        self.assertEqual(history.cache_stats()["evictions"], 1)
+
+    def test_history_is_kept_in_date_order(self):
+        """Test doses entered out of order are listed by date, in either date format"""
+        self.history.add_medication("P001", "Cetirizine", "10mg", "7/11/25")
+        self.history.medications("P001")
+        self.history.add_medication("P001", "Amoxicillin", "250mg", "2025-07-01")
+        self.history.add_medication("P001", "Vitamin C", "1g", "not sure")
+        self.assertEqual([m[0] for m in self.history.medications("P001")],
+                         ["Vitamin C", "Amoxicillin", "Paracetamol", "Cetirizine", "Ibuprofen"])
+        self.assertEqual(self.history.patients.peek("P001").tail.med_name, "Ibuprofen")
+
+    def test_medications_between(self):
+        """Test the date range query is inclusive at both ends"""
+        self.history.add_medication("P001", "Paracetamol", "1g", "2025-07-14")
+        between = self.history.medications_between("P001", "2025-07-10", datetime.date(2025, 7, 12))
+        self.assertEqual([m[0] for m in between], ["Paracetamol", "Ibuprofen"])
+        self.assertEqual(self.history.medications_between("P001", "2025-06-01", "2025-06-14"), [])
+
+    def test_latest_dose(self):
+        """Test the latest dose of one medication, optionally as of a date"""
+        self.history.add_medication("P001", "Paracetamol", "1g", "2025-07-14")
+        self.history.add_medication("P001", "Paracetamol", "750mg", "2025-07-12")
+        self.assertEqual(self.history.latest_dose("P001", "Paracetamol"), ("Paracetamol", "1g", "2025-07-14"))
+        self.assertEqual(self.history.latest_dose("P001", "Paracetamol", "2025-07-13"),
+                         ("Paracetamol", "750mg", "2025-07-12"))
+        self.assertIsNone(self.history.latest_dose("P001", "Paracetamol", "2025-07-01"))
+        self.history.delete_medication("P001", "Paracetamol")
+        self.assertIsNone(self.history.latest_dose("P001", "Paracetamol"))
+        self.assertEqual(self.history.medications_between("P001", "2025-07-01", "2025-07-31"),
+                         [("Ibuprofen", "200mg", "2025-07-12")])
+
+    def test_byte_size_covers_the_index_lists(self):
+        """Test nbytes counts the sorted index entries and returns to its start after a delete"""
+        history = self.history._history("P001")
+        loaded = history.nbytes
+        for day in range(1, 11):
+            self.history.add_medication("P001", "Cetirizine", "10mg", f"2025-08-{day:02d}")
+        nodes_and_strings = sum(sys.getsizeof(node) + sys.getsizeof(node.med_name) +
+                                sys.getsizeof(node.dosage) + sys.getsizeof(node.date)
+                                for node in history.by_name["Cetirizine"][1])
+        # Ten doses each hold four list slots and an int ordinal on top of that
+        self.assertGreaterEqual(history.nbytes - loaded, nodes_and_strings + 10 * (4 * 8 + 28))
+        self.assertEqual(self.history.patients.bytes, history.nbytes)
+
+        self.history.delete_medication("P001", "Cetirizine")
+        self.assertEqual(history.nbytes, loaded)
+
+    def test_show_history_rows(self):
+        """Test show_medication_history keeps its (patient, name, dosage, date) rows"""
+        rows = self.history.show_medication_history("P001")
+        self.assertEqual(rows[0], ("P001", "Paracetamol", "500mg", "2025-07-10"))
+        self.assertEqual(len(self.history.show_medication_history()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from ..database.connection_manager import HOSPITAL_DB, manager, transaction
+from ..database.persistence_worker import PersistenceWorker
+from ..ds.LinkedList_medication import MedicationHistory
+
+
+def insert_item(name):
+    with transaction(HOSPITAL_DB) as conn:
+        conn.execute("INSERT INTO items VALUES (?)", (name,))
+    return name
+
+
+def hold(started, gate):
+    started.set()
+    gate.wait()
+
+
+def fail(message):
+    insert_item("rolled back")
+    raise ValueError(message)
+
+
+class TestPersistenceWorker(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.patch = mock.patch.dict(manager.paths, {HOSPITAL_DB: self.db_path})
+        self.patch.start()
+        with transaction(HOSPITAL_DB) as conn:
+            conn.execute("CREATE TABLE items (name TEXT)")
+            conn.execute("CREATE TABLE medication_history (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "patient_id TEXT, med_name TEXT, dosage TEXT, date TEXT)")
+        self.errors = []
+        self.worker = PersistenceWorker(maxsize=10, on_error=self.errors.append)
+
+    def tearDown(self):
+        self.worker.shutdown()
+        self.patch.stop()
+        manager.close()
+        os.remove(self.db_path)
+
+    def items(self):
+        conn = sqlite3.connect(self.db_path)
+        rows = [row[0] for row in conn.execute("SELECT name FROM items ORDER BY rowid")]
+        conn.close()
+        return rows
+
+    def test_writes_are_grouped_and_callbacks_run_on_poll(self):
+        """Test queued jobs share a commit and report back only when polled"""
+        started, gate = threading.Event(), threading.Event()
+        self.worker.submit(HOSPITAL_DB, hold, started, gate)  # hold the worker so the next jobs queue up
+        started.wait()
+        done = []
+        for name in ["A", "B", "C"]:
+            self.worker.submit(HOSPITAL_DB, insert_item, name, on_done=done.append)
+        self.assertGreaterEqual(self.worker.depth(), 3)
+        gate.set()
+        self.worker.flush()
+
+        self.assertEqual(self.items(), ["A", "B", "C"])
+        self.assertEqual(done, [])
+        self.assertEqual(self.worker.poll(), 3)
+        self.assertEqual(done, ["A", "B", "C"])
+        stats = self.worker.stats()
+        self.assertEqual((stats["depth"], stats["committed"], stats["batches"]), (0, 4, 2))
+
+    def test_failed_job_only_undoes_itself(self):
+        """Test a failing job rolls back to its savepoint and reports its error"""
+        started, gate = threading.Event(), threading.Event()
+        self.worker.submit(HOSPITAL_DB, hold, started, gate)
+        started.wait()
+        own_errors = []
+        self.worker.submit(HOSPITAL_DB, insert_item, "A")
+        self.worker.submit(HOSPITAL_DB, fail, "boom", on_error=own_errors.append)
+        self.worker.submit(HOSPITAL_DB, fail, "default handler")
+        self.worker.submit(HOSPITAL_DB, insert_item, "B")
+        gate.set()
+        self.worker.flush()
+        self.worker.poll()
+
+        self.assertEqual(self.items(), ["A", "B"])
+        self.assertEqual([str(e) for e in own_errors], ["boom"])
+        self.assertEqual([str(e) for e in self.errors], ["default handler"])
+        self.assertEqual(self.worker.failed, 2)
+
+    def test_shutdown_writes_everything_queued(self):
+        """Test nothing submitted before shutdown is lost"""
+        for i in range(25):
+            self.worker.submit(HOSPITAL_DB, insert_item, str(i))
+        self.worker.shutdown()
+        self.assertEqual(len(self.items()), 25)
+        with self.assertRaises(RuntimeError):
+            self.worker.submit(HOSPITAL_DB, insert_item, "late")
+
+    def test_medication_adds_go_through_the_worker(self):
+        """Test MedicationHistory reads see adds that are still queued"""
+        history = MedicationHistory(writer=self.worker)
+        history.add_medication("P001", "Paracetamol", "500mg", "2025-07-10")
+        history.add_medication("P001", "Ibuprofen", "200mg", "2025-07-09")
+        self.assertEqual([m[0] for m in history.medications("P001")], ["Ibuprofen", "Paracetamol"])
+        self.assertEqual(history.delete_medication("P001", "Ibuprofen"), 1)
+
+    def test_reads_wait_for_a_job_taken_but_not_committed(self):
+        """Test a job the worker has dequeued still counts as pending until its commit"""
+        started, gate = threading.Event(), threading.Event()
+        self.worker.submit(HOSPITAL_DB, hold, started, gate)
+        started.wait()
+
+        # Stop the worker right after its next get(), before it commits
+        taken, commit = threading.Event(), threading.Event()
+        get = self.worker._jobs.get
+
+        def get_then_wait(*args, **kwargs):
+            job = get(*args, **kwargs)
+            if job is not None and not commit.is_set():
+                taken.set()
+                commit.wait()
+            return job
+
+        self.worker._jobs.get = get_then_wait
+        gate.set()
+        history = MedicationHistory(writer=self.worker)
+        history.add_medication("P001", "Paracetamol", "500mg", "2025-07-10")
+        taken.wait()
+        try:
+            self.assertEqual(self.worker._jobs.qsize(), 0)
+            self.assertEqual(self.worker.depth(), 1)
+
+            threading.Timer(0.05, commit.set).start()
+            self.assertEqual(history.medications("P001"), [("Paracetamol", "500mg", "2025-07-10")])
+        finally:
+            commit.set()  # never leave the worker stuck for shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
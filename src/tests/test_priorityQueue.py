@@ -1,6 +1,12 @@
+import os
+import sqlite3
+import tempfile
 import unittest
+from unittest import mock
 # Corrected import statement to get Patient and PriorityQueue from the ds.priorityQueue module
 from ..ds.priorityQueue import Patient, PriorityQueue
+from ..database import priorityQueue_dao, priorityQueue_db_config
+from ..database.connection_manager import PRIORITY_QUEUE_DB, manager
 
 class TestPriorityQueue(unittest.TestCase):
 
@@ -148,6 +154,251 @@ class TestPriorityQueue(unittest.TestCase):
 
         self.assertFalse(p1 < p1) # A patient is not less than itself
 
+    def test_many_patients_come_out_sorted_and_stable(self):
+        """Large random workload pops in (priority, arrival) order."""
+        import random
+        rng = random.Random(7)
+        expected = []
+        for i in range(2000):
+            priority = rng.randint(1, 5)
+            self.pq.insert(f"P{i}", priority)
+            expected.append((priority, i))
+
+        popped = []
+        while not self.pq.is_empty():
+            patient = self.pq.remove_highest_priority()
+            popped.append((patient.priority, patient.arrival_order))
+        self.assertEqual(popped, sorted(expected))
+
+    def test_interleaved_insert_and_remove(self):
+        """Removals between inserts still return the current best patient."""
+        self.pq.insert("A", 3)
+        self.pq.insert("B", 2)
+        self.assertEqual(self.pq.remove_highest_priority().name, "B")
+        self.pq.insert("C", 3)
+        self.pq.insert("D", 1)
+        self.assertEqual([self.pq.remove_highest_priority().name for _ in range(3)], ["D", "A", "C"])
+        self.assertIsNone(self.pq.remove_highest_priority())
+
+    def test_update_priority_reorders_patient(self):
+        """A deteriorating patient can be moved ahead without a rebuild."""
+        a = self.pq.insert("A", 3)
+        b = self.pq.insert("B", 3)
+        c = self.pq.insert("C", 2)
+
+        self.assertTrue(self.pq.update_priority(b, 1))
+        self.assertTrue(self.pq.update_priority(c, 4))
+        self.assertFalse(self.pq.update_priority(99, 1))
+
+        order = [self.pq.remove_highest_priority() for _ in range(3)]
+        self.assertEqual([p.name for p in order], ["B", "A", "C"])
+        self.assertEqual(order[0].priority, 1)
+        self.assertFalse(self.pq.contains(a))
+
+    def test_remove_by_handle(self):
+        """Patients who leave are removed in place and the heap stays valid."""
+        handles = [self.pq.insert(f"P{i}", (i * 7) % 5 + 1) for i in range(50)]
+        for handle in handles[::3]:
+            self.assertEqual(self.pq.remove(handle).arrival_order, handle)
+        self.assertIsNone(self.pq.remove(handles[0]))
+
+        kept = set(handles) - set(handles[::3])
+        self.assertEqual(self.pq.size(), len(kept))
+        self.assertTrue(all(handle in self.pq for handle in kept))
+
+        popped = []
+        while not self.pq.is_empty():
+            patient = self.pq.remove_highest_priority()
+            popped.append((patient.priority, patient.arrival_order))
+        self.assertEqual(popped, sorted(popped))
+        self.assertEqual({handle for _, handle in popped}, kept)
+
+    def test_restore_puts_a_removed_patient_back_in_place(self):
+        """A patient removed by mistake regains their place among equal priorities."""
+        a = self.pq.insert("A", 2)
+        self.pq.insert("B", 2)
+        patient = self.pq.remove(a)
+        self.pq.restore(patient)
+        self.assertEqual(self.pq.remove_highest_priority().name, "A")
+        with self.assertRaises(ValueError):
+            self.pq.restore(self.pq.peek())
+
+    def test_from_rows_restores_exact_order(self):
+        """A queue rebuilt from saved rows pops in the same order as the original."""
+        handles = [self.pq.insert(f"P{i}", (i * 3) % 5 + 1) for i in range(200)]
+        self.pq.remove(handles[10])
+        rows = [(p.name, p.priority, p.arrival_order) for p in self.pq.heap]
+
+        restored = PriorityQueue.from_rows(reversed(rows))
+        self.assertEqual(restored.size(), 199)
+        self.assertEqual(restored.counter, 200)
+        self.assertTrue(restored.contains(handles[20]))
+        while not self.pq.is_empty():
+            self.assertEqual(restored.remove_highest_priority().arrival_order,
+                             self.pq.remove_highest_priority().arrival_order)
+
+    def test_aging_lets_long_waiters_overtake(self):
+        """With aging, a low-priority patient eventually beats new urgent arrivals."""
+        now = [0.0]
+        pq = PriorityQueue(aging_interval=60, clock=lambda: now[0])
+        pq.insert("Minor", 5)
+        now[0] = 200.0  # Minor has gained 3.33 levels
+        pq.insert("Urgent", 2)
+        pq.insert("Moderate", 4)
+
+        self.assertAlmostEqual(pq.effective_priority(pq.heap[0]), 5 - 200 / 60)
+        self.assertEqual([pq.remove_highest_priority().name for _ in range(3)], ["Minor", "Urgent", "Moderate"])
+
+    def test_effective_priority_follows_heap_order(self):
+        """Aging credit is not capped, so the reported priority matches who is served first."""
+        now = [0.0]
+        pq = PriorityQueue(aging_interval=60, clock=lambda: now[0])
+        pq.insert("Long wait", 2)
+        now[0] = 300.0
+        pq.insert("Short wait", 2)
+        now[0] = 330.0
+
+        first, second = pq.remove_highest_priority(), pq.remove_highest_priority()
+        self.assertEqual(first.name, "Long wait")
+        self.assertLess(pq.effective_priority(first), pq.effective_priority(second))
+        self.assertLess(pq.effective_priority(first), 1)
+
+    def test_from_rows_can_ignore_saved_arrival_times(self):
+        """With another clock, saved wall-clock times are skipped and everyone counts as queued now."""
+        rows = [("A", 3, 0, "2020-01-01 08:00:00"), ("B", 3, 1, "2020-01-01 09:00:00")]
+        restored = PriorityQueue.from_rows(rows, restore_arrival_times=False, clock=lambda: 5.0)
+        self.assertEqual([patient.enqueued_at for patient in restored.heap], [5.0, 5.0])
+
+        restored = PriorityQueue.from_rows(rows)
+        self.assertLess(restored.heap[0].enqueued_at, restored.heap[1].enqueued_at)
+
+    def test_without_aging_order_is_static(self):
+        now = [0.0]
+        pq = PriorityQueue(clock=lambda: now[0])
+        pq.insert("Minor", 5)
+        now[0] = 10_000.0
+        pq.insert("Urgent", 2)
+        self.assertEqual(pq.remove_highest_priority().name, "Urgent")
+        self.assertEqual(pq.effective_priority(pq.heap[0]), 5)
+
+    def test_wait_stats_per_priority(self):
+        """Served patients contribute their waiting time to their priority level."""
+        now = [0.0]
+        pq = PriorityQueue(clock=lambda: now[0])
+        pq.insert("A", 1)
+        pq.insert("B", 3)
+        pq.insert("C", 3)
+        now[0] = 10.0
+        pq.remove_highest_priority()
+        now[0] = 30.0
+        pq.remove_highest_priority()
+        pq.remove(pq.heap[0].arrival_order)  # left without being served
+
+        self.assertEqual(pq.wait_stats(), {
+            1: {"served": 1, "mean_wait": 10.0, "max_wait": 10.0},
+            3: {"served": 1, "mean_wait": 30.0, "max_wait": 30.0},
+        })
+
+    def test_peek_and_top_k(self):
+        """peek and top_k follow serving order and leave the heap untouched."""
+        self.assertIsNone(self.pq.peek())
+        self.assertEqual(self.pq.top_k(3), [])
+        for i, priority in enumerate([4, 2, 5, 1, 2, 3, 1]):
+            self.pq.insert(f"P{i}", priority)
+        heap_before = list(self.pq.heap)
+
+        self.assertEqual(self.pq.peek().name, "P3")
+        self.assertEqual([p.name for p in self.pq.top_k(4)], ["P3", "P6", "P1", "P4"])
+        self.assertEqual(len(self.pq.top_k(100)), 7)
+        self.assertEqual(self.pq.heap, heap_before)
+
+    def test_priority_order_iterator_matches_popping(self):
+        import random
+        rng = random.Random(3)
+        for i in range(500):
+            self.pq.insert(f"P{i}", rng.randint(1, 5))
+        viewed = [p.arrival_order for p in self.pq.iter_priority_order()]
+
+        popped = []
+        while not self.pq.is_empty():
+            popped.append(self.pq.remove_highest_priority().arrival_order)
+        self.assertEqual(viewed, popped)
+
+    def test_from_rows_rejects_duplicate_arrival_orders(self):
+        with self.assertRaises(ValueError):
+            PriorityQueue.from_rows([("A", 1, 0), ("B", 2, 0)])
+
+
+class TestPriorityQueuePersistence(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.patch = mock.patch.dict(manager.paths, {PRIORITY_QUEUE_DB: self.db_path})
+        self.patch.start()
+        priorityQueue_db_config.initialize_db()
+
+    def tearDown(self):
+        self.patch.stop()
+        manager.close()
+        os.remove(self.db_path)
+
+    def test_served_patients_are_not_restored(self):
+        """Only patients still waiting come back after a restart."""
+        queue = PriorityQueue()
+        for name, priority in [("A", 3), ("B", 1), ("C", 3), ("D", 2)]:
+            priorityQueue_dao.add_patient_to_db(name, priority, queue.insert(name, priority))
+        served = queue.remove_highest_priority()
+        priorityQueue_dao.remove_patient_from_db(served.arrival_order)
+        priorityQueue_dao.update_patient_priority_db(2, 1)
+        queue.update_priority(2, 1)
+
+        restored = PriorityQueue.from_rows(priorityQueue_dao.get_all_patients())
+        self.assertEqual([restored.remove_highest_priority().name for _ in range(3)], ["C", "D", "A"])
+        self.assertEqual(restored.counter, 4)
+
+    def test_arrival_sequence_survives_restart_and_is_shared(self):
+        """Two sequences (stations or restarts) never hand out the same number."""
+        first = priorityQueue_dao.ArrivalSequence(block_size=4)
+        second = priorityQueue_dao.ArrivalSequence(block_size=4)
+        numbers = [first.next(), second.next(), first.next(), second.next()]
+        self.assertEqual(numbers, [0, 4, 1, 5])
+
+        # A restarted process continues after every reserved block
+        restarted = priorityQueue_dao.ArrivalSequence(block_size=4)
+        self.assertEqual(restarted.next(), 8)
+
+        queue = PriorityQueue(sequence=priorityQueue_dao.ArrivalSequence(block_size=2).next)
+        self.assertEqual([queue.insert("A", 1), queue.insert("B", 1), queue.insert("C", 1)], [12, 13, 14])
+
+    def test_shared_sequence_numbers_follow_arrival_across_stations(self):
+        """Stations using the app's sequence number arrivals in the order they happen."""
+        self.assertEqual(priorityQueue_dao.arrival_sequence.block_size, 1)
+        first = priorityQueue_dao.ArrivalSequence(block_size=1)
+        second = priorityQueue_dao.ArrivalSequence(block_size=1)
+        self.assertEqual([first.next(), second.next(), second.next(), first.next()], [0, 1, 2, 3])
+
+    def test_sequence_starts_after_existing_rows(self):
+        priorityQueue_dao.add_patient_to_db("A", 2, 41)
+        priorityQueue_db_config.initialize_db()
+        self.assertEqual(priorityQueue_dao.ArrivalSequence().next(), 42)
+
+    def test_remove_reports_whether_the_row_was_claimed(self):
+        priorityQueue_dao.add_patient_to_db("A", 2, 7)
+        self.assertTrue(priorityQueue_dao.remove_patient_from_db(7))
+        self.assertFalse(priorityQueue_dao.remove_patient_from_db(7))
+
+    def test_legacy_duplicate_arrival_orders_are_renumbered(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("INSERT INTO patients (name, priority, arrival_order) VALUES (?, ?, ?)",
+                         [("Old A", 2, 0), ("Old B", 2, 1), ("New C", 2, 0)])
+        conn.commit()
+        conn.close()
+
+        priorityQueue_db_config.initialize_db()
+        restored = PriorityQueue.from_rows(priorityQueue_dao.get_all_patients())
+        self.assertEqual([restored.remove_highest_priority().name for _ in range(3)], ["Old A", "Old B", "New C"])
+
 # This allows you to run the tests directly from the command line
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,66 @@
+import unittest
+
+from ..ds.queue_appointments import AppointmentQueue
+
+
+class TestAppointmentQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = AppointmentQueue(capacity=2)
+
+    def test_fifo_with_timestamps(self):
+        self.queue.enqueue("Mark Tavin", "2025-07-10 09:00:00")
+        self.queue.enqueue("David Peter", "2025-07-10 09:05:00")
+        stamp = self.queue.enqueue("Aisha Mohammed")
+
+        self.assertEqual(len(self.queue), 3)
+        self.assertEqual(self.queue.viewQueue(), ["Mark Tavin", "David Peter", "Aisha Mohammed"])
+        self.assertEqual(self.queue.peek(), ("Mark Tavin", "2025-07-10 09:00:00"))
+        self.assertEqual(self.queue.dequeue(), "Mark Tavin")
+        self.assertEqual(self.queue.dequeue_entry(), ("David Peter", "2025-07-10 09:05:00"))
+        self.assertEqual(list(self.queue), [("Aisha Mohammed", stamp)])
+
+    def test_empty_queue(self):
+        self.assertIsNone(self.queue.dequeue())
+        self.assertIsNone(self.queue.dequeue_entry())
+        self.assertIsNone(self.queue.peek())
+        self.assertEqual(self.queue.viewQueue(), [])
+
+    def test_same_name_patients_are_served_one_at_a_time(self):
+        for name in ["Ann", "Bob", "Ann"]:
+            self.queue.enqueue(name)
+        self.assertEqual(self.queue.dequeue(), "Ann")
+        self.assertEqual(self.queue.viewQueue(), ["Bob", "Ann"])
+
+    def test_wraps_grows_and_shrinks(self):
+        served = []
+        for i in range(100):
+            self.queue.enqueue(i, str(i))
+            if i % 3 == 0:
+                served.append(self.queue.dequeue())
+        remaining = [name for name, _ in self.queue]
+        self.assertEqual(served + remaining, list(range(100)))
+
+        while len(self.queue) > 1:
+            self.queue.dequeue()
+        self.assertLessEqual(len(self.queue._names), 8)
+        self.assertEqual(self.queue.viewQueue(), [99])
+
+    def test_window(self):
+        for i in range(10):
+            self.queue.enqueue(f"P{i}", f"T{i}")
+        self.queue.dequeue()
+        self.assertEqual(self.queue.window(2, 3), [("P3", "T3"), ("P4", "T4"), ("P5", "T5")])
+        self.assertEqual(self.queue.window(8, 5), [("P9", "T9")])
+        self.assertEqual(self.queue.window(20, 5), [])
+
+    def test_iterating_while_changing_fails(self):
+        self.queue.enqueue("A")
+        self.queue.enqueue("B")
+        with self.assertRaises(RuntimeError):
+            for _ in self.queue:
+                self.queue.enqueue("C")
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
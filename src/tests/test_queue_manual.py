@@ -1,4 +1,4 @@
-from ds.queue_appointments import AppointmentQueue
+from ..ds.queue_appointments import AppointmentQueue
 
 queue=AppointmentQueue()
 
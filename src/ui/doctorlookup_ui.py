@@ -1,46 +1,35 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import logging
-import sys
 import os
 import csv
 import datetime
-from pathlib import Path
 
-# --- Path Setup ---
-base_dir = Path(__file__).resolve().parent
-ds_dir = base_dir.parent / 'ds'
-db_dir = base_dir.parent / 'database'
-
-sys.path.extend([str(ds_dir), str(db_dir)])
-
-try:
-    from bst_doctorlookup import Doctor, DoctorBST
-except ImportError:
-    print("Error: Could not import Doctor or DoctorBST from bst_doctorlookup.")
-    sys.exit(1)
-
-try:
-    import bst_db_connection as db
-except ImportError:
-    print("Error: Could not import bst_db_connection.")
-    sys.exit(1)
+from ..ds.bst_doctorlookup import Doctor, DoctorBST
+from ..database import bst_db_connection as db
+from ..database.persistence_worker import PersistenceWorker
 
 # --- Logging ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 
 
 class DoctorLookupApp:
+    PAGE_SIZE = 50
+
     def __init__(self, root):
         self.root = root
         self.root.title("🩺 Doctor Lookup System")
         self.root.configure(bg="#f5f5f5")
         self.tree = DoctorBST()
+        self.page = 0
+        # Writes are committed in the background; failures come back through on_error
+        self.writer = PersistenceWorker(on_error=self.save_failed)
+        self.writer.attach(root)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         try:
             db.initialize_db()
-            for name, specialty in db.fetch_all_doctors():
-                self.tree.insertDoctor(Doctor(name, specialty))
+            self.tree = DoctorBST.fromSorted(Doctor(name, specialty) for name, specialty in db.fetch_all_doctors())
             logging.info("Doctors loaded from database.")
         except Exception as e:
             logging.error(f"Database initialization error: {e}")
@@ -72,9 +61,12 @@ class DoctorLookupApp:
         btn_style = {"width": 16, "font": ("Segoe UI", 9)}
         tk.Button(button_frame, text="➕ Add Doctor", command=self.add_doctor, **btn_style).pack(pady=2)
         tk.Button(button_frame, text="🔍 Search", command=self.search_doctor, **btn_style).pack(pady=2)
+        tk.Button(button_frame, text="🏷️ By Specialty", command=self.search_specialty, **btn_style).pack(pady=2)
         tk.Button(button_frame, text="✏️ Update", command=self.update_doctor, **btn_style).pack(pady=2)
         tk.Button(button_frame, text="❌ Delete", command=self.delete_doctor, **btn_style).pack(pady=2)
         tk.Button(button_frame, text="📋 Show All", command=self.display_all, **btn_style).pack(pady=2)
+        tk.Button(button_frame, text="◀ Prev Page", command=self.prev_page, **btn_style).pack(pady=2)
+        tk.Button(button_frame, text="Next Page ▶", command=self.next_page, **btn_style).pack(pady=2)
         tk.Button(button_frame, text="🧹 Clear Fields", command=self.clear_entries, **btn_style).pack(pady=2)
         tk.Button(button_frame, text="📄 Export CSV", command=self.export_csv, **btn_style).pack(pady=10)
 
@@ -98,6 +90,22 @@ class DoctorLookupApp:
     def update_status(self, message):
         self.status_label.config(text=message)
 
+    def save(self, fn, *args, undo):
+        # Write in the background; undo reverts the tree if the write fails
+        self.writer.submit(db.DB_NAME, fn, *args, on_error=lambda exc: self.save_failed(exc, undo))
+
+    def save_failed(self, exc, undo=None):
+        logging.error(f"Database write failed: {exc}")
+        if undo is not None:
+            undo()
+            self.display_all()
+        self.update_status(f"⚠️ Could not save change: {exc}")
+        messagebox.showerror("Database Error", str(exc))
+
+    def on_close(self):
+        self.writer.shutdown()
+        self.root.destroy()
+
     def clear_entries(self):
         self.name_entry.delete(0, tk.END)
         self.specialty_entry.delete(0, tk.END)
@@ -116,7 +124,7 @@ class DoctorLookupApp:
         try:
             doctor = Doctor(name, specialty)
             self.tree.insertDoctor(doctor)
-            db.insert_doctor_db(name, specialty)
+            self.save(db.insert_doctor_db, name, specialty, undo=lambda: self.tree.deleteDoctor(name))
             logging.info(f"Doctor '{name}' added.")
             self.display_all()
             self.clear_entries()
@@ -139,12 +147,34 @@ class DoctorLookupApp:
                 self.specialty_entry.delete(0, tk.END)
                 self.specialty_entry.insert(0, doctor.specialty)
                 self.update_status(f"Doctor '{name}' found.")
+            elif matches := self.tree.prefixSearch(name, limit=self.PAGE_SIZE):
+                self.result_listbox.insert(tk.END, f"🔎 Names starting with '{name}':")
+                for doc in matches:
+                    self.result_listbox.insert(tk.END, str(doc))
+                self.update_status(f"{len(matches)} doctors starting with '{name}'.")
             else:
                 self.result_listbox.insert(tk.END, f"❌ Doctor '{name}' not found.")
                 self.update_status(f"Doctor '{name}' not found.")
         except Exception as e:
             messagebox.showerror("Search Error", str(e))
 
+    def search_specialty(self):
+        specialty = self.specialty_entry.get().strip()
+        if not specialty:
+            messagebox.showwarning("Input Error", "Enter a specialty to search.")
+            return
+        doctors = self.tree.doctorsBySpecialty(specialty)
+        self.result_listbox.delete(0, tk.END)
+        if doctors:
+            self.result_listbox.insert(tk.END, f"🏷️ {specialty}: {len(doctors)} doctors")
+            self.result_listbox.insert(tk.END, "-" * 70)
+            for doc in doctors:
+                self.result_listbox.insert(tk.END, str(doc))
+            self.update_status(f"{len(doctors)} doctors in {specialty}.")
+        else:
+            self.result_listbox.insert(tk.END, f"❌ No doctors found for '{specialty}'.")
+            self.update_status(f"No doctors in {specialty}.")
+
     def update_doctor(self):
         name = self.name_entry.get().strip()
         specialty = self.specialty_entry.get().strip()
@@ -152,8 +182,11 @@ class DoctorLookupApp:
             messagebox.showwarning("Input Error", "Name and Specialty are required.")
             return
 
+        doctor = self.tree.searchDoctor(name)
+        old_specialty = doctor.specialty if doctor else None
         if self.tree.updateDoctor(name, specialty):
-            db.update_doctor_db(name, specialty)
+            self.save(db.update_doctor_db, name, specialty,
+                      undo=lambda: self.tree.updateDoctor(name, old_specialty))
             logging.info(f"Doctor '{name}' updated.")
             self.display_all()
             self.clear_entries()
@@ -168,13 +201,14 @@ class DoctorLookupApp:
             messagebox.showwarning("Input Error", "Enter a name to delete.")
             return
 
-        if not self.tree.searchDoctor(name):
+        doctor = self.tree.searchDoctor(name)
+        if not doctor:
             messagebox.showerror("Error", f"Doctor '{name}' not found.")
             return
 
         if messagebox.askyesno("Confirm Delete", f"Delete Dr. {name}?"):
             self.tree.deleteDoctor(name)
-            db.delete_doctor_db(name)
+            self.save(db.delete_doctor_db, name, undo=lambda: self.tree.insertDoctor(doctor))
             logging.info(f"Doctor '{name}' deleted.")
             self.display_all()
             self.clear_entries()
@@ -184,23 +218,34 @@ class DoctorLookupApp:
     def display_all(self):
         try:
             self.result_listbox.delete(0, tk.END)
-            doctors = self.tree.inorderTraversal()
-            if doctors:
-                self.result_listbox.insert(tk.END, f"📋 Total Doctors: {len(doctors)}")
+            total = len(self.tree)
+            if total:
+                pages = (total - 1) // self.PAGE_SIZE + 1
+                self.page = min(self.page, pages - 1)
+                doctors = self.tree.getPage(self.page, self.PAGE_SIZE)
+                self.result_listbox.insert(tk.END, f"📋 Total Doctors: {total}  (page {self.page + 1} of {pages})")
                 self.result_listbox.insert(tk.END, "-" * 70)
                 for doc in doctors:
                     self.result_listbox.insert(tk.END, str(doc))
-                self.update_status(f"{len(doctors)} doctors displayed.")
+                self.update_status(f"{len(doctors)} of {total} doctors displayed.")
             else:
                 self.result_listbox.insert(tk.END, "No doctors found.")
                 self.update_status("No doctors to display.")
         except Exception as e:
             messagebox.showerror("Display Error", str(e))
 
+    def next_page(self):
+        if (self.page + 1) * self.PAGE_SIZE < len(self.tree):
+            self.page += 1
+        self.display_all()
+
+    def prev_page(self):
+        self.page = max(0, self.page - 1)
+        self.display_all()
+
     def export_csv(self):
         try:
-            doctors = self.tree.inorderTraversal()
-            if not doctors:
+            if self.tree.root is None:
                 messagebox.showinfo("No Data", "There are no doctors to export.")
                 return
 
@@ -216,8 +261,7 @@ class DoctorLookupApp:
                 with open(file_path, mode='w', newline='', encoding='utf-8') as file:
                     writer = csv.writer(file)
                     writer.writerow(["Name", "Specialty"])
-                    for doc in doctors:
-                        writer.writerow([doc.name, doc.specialty])
+                    writer.writerows((doc.name, doc.specialty) for doc in self.tree.iterDoctors())
                 logging.info(f"Exported to {file_path}")
                 self.update_status(f"Exported to {file_path}")
                 messagebox.showinfo("Export Successful", f"Doctors exported to:\n{file_path}")
@@ -2,9 +2,11 @@ import tkinter as tk
 from tkinter import messagebox, scrolledtext
 from tkcalendar import DateEntry
 from src.ds.LinkedList_medication import MedicationHistory
+from src.database.persistence_worker import PersistenceWorker
 
-# Initialize the data structure
-med_manager = MedicationHistory()
+# Initialize the data structure; adds are committed in the background
+db_writer = PersistenceWorker()
+med_manager = MedicationHistory(writer=db_writer)
 
 # ------------------- Functions -------------------
 def add_med():
@@ -42,6 +44,11 @@ def show_history():
         log_output.insert(tk.END, f"  • Patient: {med[0]} — {med[1]} ({med[2]}) on {med[3]}\n")
 
 
+def on_close():
+    db_writer.shutdown()
+    root.destroy()
+
+
 def show_tooltip(event, text):
     tooltip.config(text=text)
     tooltip.place(x=event.x_root - root.winfo_rootx() + 20, y=event.y_root - root.winfo_rooty() + 10)
@@ -52,6 +59,8 @@ def hide_tooltip(event):
 # ------------------- UI Setup -------------------
 root = tk.Tk()
 root.title("💊 Medication Manager")
+db_writer.attach(root)
+root.protocol("WM_DELETE_WINDOW", on_close)
 root.config(bg="#0f172a")
 root.geometry("800x500")
 root.resizable(False, False)
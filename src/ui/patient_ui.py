@@ -13,22 +13,29 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'd
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ds')))
 
 from ..ds.hashtable_patients import HashTable, Patient
+from ..database.connection_manager import HOSPITAL_DB
+from ..database.persistence_worker import PersistenceWorker
 from ..database.db_connection import (
     insert_patient_to_db,
     delete_patient_from_db,
     get_all_patients,
+    count_patients,
+    iter_patients,
     init_db,
 )
 
 # Initialize DB and hash table
 init_db()
 hashtable = HashTable()
+# Inserts and deletes are committed in the background so the window never waits on the disk
+db_writer = PersistenceWorker()
 
 
-# Load existing database entries into the hashtable
-for row in get_all_patients():
-    patient = Patient(*row) 
-    hashtable.addPatient(patient)
+# Load existing database entries into the hashtable. The table is presized from
+# the row count and rows are streamed in chunks; ids are the primary key of the
+# patients table so the per-row duplicate check can be skipped.
+hashtable.reserve(count_patients())
+hashtable.bulkLoad((Patient(*row) for row in iter_patients()), check_duplicates=False)
 
 
 # Function to log to output box
@@ -63,7 +70,8 @@ def add_patient():
 
     # Add patient to hash table and consequently, the database
     if hashtable.addPatient(patient):
-        insert_patient_to_db(patient)
+        db_writer.submit(HOSPITAL_DB, insert_patient_to_db, patient,
+                      on_error=lambda exc: save_failed(patient, exc))
         log(f"✅ SUCCESS: Added patient {name} (ID: {id})")
         clear_entries()
         messagebox.showinfo("✅ Success", f"Patient {name} added successfully!")
@@ -111,8 +119,10 @@ def delete_patient():
     
     # Confirm delete
     if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete patient ID {id}?"):
+        patient = hashtable.getPatient(id)
         if hashtable.removePatient(id):
-            delete_patient_from_db(id)
+            db_writer.submit(HOSPITAL_DB, delete_patient_from_db, id,
+                          on_error=lambda exc: delete_failed(patient, exc))
             log(f"✅ SUCCESS: Deleted patient ID {id}")
             clear_entries()
             messagebox.showinfo("✅ Success", f"Patient ID {id} deleted successfully!")
@@ -122,9 +132,30 @@ def delete_patient():
             messagebox.showerror("❌ Error", f"Patient ID {id} not found!")
 
 
+# A background insert failed: take the patient back out so the table matches the database
+def save_failed(patient, exc):
+    hashtable.removePatient(patient.id)
+    log(f"❌ ERROR: Could not save patient {patient.name} (ID: {patient.id}): {exc}")
+    messagebox.showerror("❌ Error", f"Patient {patient.name} could not be saved:\n{exc}")
+
+
+# A background delete failed: put the patient back since the row is still there
+def delete_failed(patient, exc):
+    hashtable.addPatient(patient)
+    log(f"❌ ERROR: Could not delete patient {patient.name} (ID: {patient.id}) from the database: {exc}")
+    messagebox.showerror("❌ Error", f"Patient {patient.name} could not be deleted:\n{exc}")
+
+
+# Write out queued changes before closing
+def on_close():
+    db_writer.shutdown()
+    root.destroy()
+
+
 # Display all patients
 def display_all_patients():
     output_box.delete(1.0, tk.END)
+    db_writer.flush()  # include changes still being written
     patients = get_all_patients()
     if not patients:
         log("No patients found in the database")
@@ -141,6 +172,7 @@ def display_all_patients():
 
 # Export patients to CSV
 def export_to_csv():
+    db_writer.flush()
     patients = get_all_patients()
     if not patients:
         log("⚠️ No patients to export")
@@ -225,6 +257,8 @@ def create_styled_button(parent, text, command, bg_color, hover_color, row, colu
 # GUI setup
 root = tk.Tk()
 root.title("Hospital Management System")
+db_writer.attach(root)
+root.protocol("WM_DELETE_WINDOW", on_close)
 
 # Main frame
 main_frame = tk.Frame(root)
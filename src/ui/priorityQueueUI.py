@@ -4,15 +4,37 @@ import datetime
 import csv
 
 from ..ds.priorityQueue import PriorityQueue
-from ..database.priorityQueue_dao import add_patient_to_db, get_all_patients
+from ..database.persistence_worker import PersistenceWorker
+from ..database.priorityQueue_db_config import DB_NAME
+from ..database.priorityQueue_dao import (
+    add_patient_to_db,
+    arrival_sequence,
+    get_all_patients,
+    remove_patient_from_db,
+    update_patient_priority_db,
+)
 
 
 class MainWindow:
+    # Seconds of waiting that earn one priority level; None disables aging
+    AGING_INTERVAL = None
+    # Rows shown by the priority-order board
+    BOARD_ROWS = 50
+
     def __init__(self, root):
         self.root = root
         self.root.title("Hospital Priority Queue System")
         self.root.geometry("700x500")
-        self.queue = PriorityQueue()
+        # Restore whoever was still waiting when the app last closed. Arrival
+        # numbers come from the database so every station agrees on ties.
+        rows = get_all_patients()
+        self.queue = PriorityQueue.from_rows(rows, sequence=arrival_sequence.next,
+                                             aging_interval=self.AGING_INTERVAL)
+        # Adds, re-ranks and removals are committed in the background
+        self.writer = PersistenceWorker(on_error=self.save_failed)
+        self.writer.attach(root)
+        self.unsaved = set()  # handles whose row has not been committed yet
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # UI Frames
         top_frame = tk.Frame(root, padx=20, pady=10)
@@ -44,6 +66,10 @@ class MainWindow:
         tk.Button(mid_frame, text="Show Priority Order", bg="#8e44ad", fg="white", command=self.show_priority_order).grid(row=0, column=1, padx=5)
         tk.Button(mid_frame, text="Clear Console", bg="#95a5a6", command=self.clear_console).grid(row=0, column=2, padx=5)
         tk.Button(mid_frame, text="Export to CSV", bg="#34495e", fg="white", command=self.export_to_csv).grid(row=0, column=3, padx=5)
+        tk.Button(mid_frame, text="Wait Stats", bg="#d35400", fg="white", command=self.show_wait_stats).grid(row=0, column=7, padx=5)
+        tk.Button(mid_frame, text="Refresh", bg="#16a085", fg="white", command=self.reload_queue).grid(row=0, column=6, padx=5)
+        tk.Button(mid_frame, text="Update Priority", bg="#c0392b", fg="white", command=self.update_priority).grid(row=0, column=4, padx=5)
+        tk.Button(mid_frame, text="Remove Selected", bg="#7f8c8d", fg="white", command=self.remove_patient).grid(row=0, column=5, padx=5)
 
         # --- Patient List Display ---
         tk.Label(list_frame, text="Patient Queue:").pack(anchor="w")
@@ -55,7 +81,11 @@ class MainWindow:
         self.log_box = scrolledtext.ScrolledText(log_frame, height=10, bg="#2c3e50", fg="#ecf0f1")
         self.log_box.pack(fill="both", expand=True)
 
-        self.arrival_order = []  # [(name, priority, timestamp)]
+        self.arrival_order = {}  # {handle: (name, priority, timestamp)}, in arrival order
+        self.row_handles = []  # queue handle shown on each row of the patient list
+        self.load_arrivals(rows)
+        if rows:
+            self.log(f"♻️ Restored {len(rows)} waiting patients")
         self.update_display()
 
     def log(self, message):
@@ -75,41 +105,165 @@ class MainWindow:
             return
 
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.queue.insert(name, priority)
-        self.arrival_order.append((name, priority, timestamp))  # now includes timestamp
-        add_patient_to_db(name, priority)
+        handle = self.queue.insert(name, priority)
+        self.arrival_order[handle] = (name, priority, timestamp)  # now includes timestamp
+        self.unsaved.add(handle)
+        self.writer.submit(DB_NAME, add_patient_to_db, name, priority, handle, timestamp,
+                           on_done=lambda _: self.unsaved.discard(handle),
+                           on_error=lambda exc: self.add_failed(handle, exc))
 
         self.name_entry.delete(0, tk.END)
         self.priority_entry.delete(0, tk.END)
         self.log(f"✅ Added: {name} (Priority {priority}) at {timestamp}")
         self.show_arrival_order()
 
+    def save_failed(self, exc):
+        self.log(f"❌ Could not save change: {exc}")
+
+    def add_failed(self, handle, exc):
+        # The row never reached the database, so take the patient back out
+        self.unsaved.discard(handle)
+        self.queue.remove(handle)
+        self.arrival_order.pop(handle, None)
+        self.save_failed(exc)
+        self.show_arrival_order()
+
+    def update_failed(self, handle, old_priority, exc):
+        # The database still has the old priority; rank the patient by it again
+        if self.queue.update_priority(handle, old_priority):
+            name, _, timestamp = self.arrival_order[handle]
+            self.arrival_order[handle] = (name, old_priority, timestamp)
+        self.save_failed(exc)
+        self.show_arrival_order()
+
+    def remove_failed(self, patient, timestamp, exc):
+        # The row is still there, so the patient is still waiting
+        self.queue.restore(patient)
+        self.arrival_order[patient.arrival_order] = (patient.name, patient.priority, timestamp)
+        self.arrival_order = dict(sorted(self.arrival_order.items()))
+        self.save_failed(exc)
+        self.show_arrival_order()
+
+    def on_close(self):
+        self.writer.shutdown()
+        self.root.destroy()
+
+    def load_arrivals(self, rows):
+        self.arrival_order = {}
+        for name, priority, handle, timestamp in sorted(rows, key=lambda row: row[2]):
+            self.arrival_order[handle] = (name, priority, timestamp or "-")
+
+    def reload_queue(self):
+        """ Pick up patients queued or served at other stations """
+        self.writer.flush()
+        self.unsaved.clear()
+        rows = get_all_patients()
+        self.queue = PriorityQueue.from_rows(rows, sequence=arrival_sequence.next,
+                                             aging_interval=self.AGING_INTERVAL)
+        self.load_arrivals(rows)
+        self.log(f"🔄 Queue refreshed: {len(rows)} waiting")
+        self.show_arrival_order()
+
     def serve_patient(self):
         """ Remove highest priority patient from queue """
-        patient = self.queue.remove_highest_priority()
+        while True:
+            patient = self.queue.remove_highest_priority()
+            if not patient:
+                messagebox.showinfo("Queue Empty", "No patients in the queue.")
+                return
+            self.arrival_order.pop(patient.arrival_order, None)
+            # Deleting the row claims the patient; if it is already gone another
+            # station served them first, so move on to the next one
+            if remove_patient_from_db(patient.arrival_order):
+                break
+            if patient.arrival_order in self.unsaved:
+                # Added here moments ago and not committed yet; once it is, the claim works
+                self.writer.flush()
+                self.unsaved.discard(patient.arrival_order)
+                if remove_patient_from_db(patient.arrival_order):
+                    break
+            self.log(f"↪️ {patient.name} was already served at another station")
+
+        self.log(f"🚑 Serving {patient.name} (Priority {patient.priority})")
+        self.show_arrival_order()
+
+    def show_wait_stats(self):
+        """ Log waiting times of patients served so far, per priority level """
+        stats = self.queue.wait_stats()
+        if not stats:
+            self.log("⏱️ No patients served yet")
+            return
+        self.log("⏱️ Wait times by priority")
+        for priority, level in stats.items():
+            self.log(f"   P{priority}: {level['served']} served, "
+                     f"mean {level['mean_wait'] / 60:.1f} min, max {level['max_wait'] / 60:.1f} min")
+
+    def selected_handle(self):
+        """ Queue handle of the patient selected in the list, if any """
+        selection = self.patient_list.curselection()
+        if not selection or selection[0] >= len(self.row_handles):
+            messagebox.showwarning("No Selection", "Select a patient in the queue first.")
+            return None
+        return self.row_handles[selection[0]]
+
+    def update_priority(self):
+        """ Re-rank the selected patient with the priority typed in the form """
+        handle = self.selected_handle()
+        if handle is None:
+            return
+        try:
+            priority = int(self.priority_entry.get())
+            if not (1 <= priority <= 5):
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Enter a priority (1-5).")
+            return
+
+        if self.queue.update_priority(handle, priority):
+            name, old_priority, timestamp = self.arrival_order[handle]
+            self.arrival_order[handle] = (name, priority, timestamp)
+            self.writer.submit(DB_NAME, update_patient_priority_db, handle, priority,
+                               on_error=lambda exc: self.update_failed(handle, old_priority, exc))
+            self.priority_entry.delete(0, tk.END)
+            self.log(f"🔁 {name}: Priority {old_priority} → {priority}")
+            self.show_arrival_order()
+
+    def remove_patient(self):
+        """ Take the selected patient out of the queue without serving them """
+        handle = self.selected_handle()
+        if handle is None:
+            return
+        patient = self.queue.remove(handle)
         if patient:
-            self.log(f"🚑 Serving {patient.name} (Priority {patient.priority})")
-            self.arrival_order = [p for p in self.arrival_order if p[0] != patient.name]
+            _, _, timestamp = self.arrival_order.pop(handle, (None, None, "-"))
+            self.writer.submit(DB_NAME, remove_patient_from_db, handle,
+                               on_error=lambda exc: self.remove_failed(patient, timestamp, exc))
+            self.log(f"🚪 Removed {patient.name} (Priority {patient.priority}) from the queue")
             self.show_arrival_order()
-        else:
-            messagebox.showinfo("Queue Empty", "No patients in the queue.")
 
     def show_arrival_order(self):
         """ Display patients in order they were added """
         self.patient_list.delete(0, tk.END)
         self.log("👥 Showing in Arrival Order")
-        for i, (name, priority, timestamp) in enumerate(self.arrival_order, 1):
+        self.row_handles = list(self.arrival_order)
+        for i, (name, priority, timestamp) in enumerate(self.arrival_order.values(), 1):
             entry = f"{i:>2}. {name:<15} Priority: {priority}  Time: {timestamp}"
             self.patient_list.insert(tk.END, entry)
 
     def show_priority_order(self):
-        """ Display patients sorted by priority """
+        """ Display the next BOARD_ROWS patients in serving order """
         self.patient_list.delete(0, tk.END)
         self.log("🔢 Showing in Priority Order")
-        sorted_patients = sorted(self.arrival_order, key=lambda x: x[1])  # sort by priority
-        for i, (name, priority, timestamp) in enumerate(sorted_patients, 1):
-            entry = f"{i:>2}. {name:<15} Priority: {priority}  Time: {timestamp}"
+        # top_k only walks as much of the heap as the board shows
+        self.row_handles = []
+        for i, patient in enumerate(self.queue.top_k(self.BOARD_ROWS), 1):
+            _, _, timestamp = self.arrival_order.get(patient.arrival_order, (None, None, "-"))
+            entry = f"{i:>2}. {patient.name:<15} Priority: {patient.priority}  Time: {timestamp}"
             self.patient_list.insert(tk.END, entry)
+            self.row_handles.append(patient.arrival_order)
+        hidden = self.queue.size() - len(self.row_handles)
+        if hidden > 0:
+            self.patient_list.insert(tk.END, f"    ... and {hidden} more waiting")
 
     def export_to_csv(self):
         """ Export the patient arrival list to a CSV file """
@@ -127,7 +281,7 @@ class MainWindow:
             with open(file_path, mode='w', newline='', encoding='utf-8') as file:
                 writer = csv.writer(file)
                 writer.writerow(["Name", "Priority", "Timestamp"])
-                for name, priority, timestamp in self.arrival_order:
+                for name, priority, timestamp in self.arrival_order.values():
                     writer.writerow([name, priority, timestamp])
             self.log(f"📄 Report saved to {file_path}")
             messagebox.showinfo("Export Successful", f"Report saved to:\n{file_path}")
@@ -4,16 +4,24 @@ import csv
 import datetime
 import os
 
-from src.ds.queue_appointments import AppointmentQueue
+from src.ds.queue_appointments import AppointmentQueue, TIMESTAMP_FORMAT
+from src.database.queue_schema import create_tables
+from src.database.appointments_dao import AppointmentWriteBehind, load_appointments
 
 
 class AppointmentQueueApp:
+    # How often buffered queue changes are written out even without new clicks
+    FLUSH_INTERVAL_MS = 2000
+
     def __init__(self, root):
         self.root = root
         self.root.title("📋 Appointment Queue System")
         self.root.geometry("700x500")
-        self.queue = AppointmentQueue()
-        self.arrival_order = []  # [(name, timestamp)]
+        # Restore whoever was still waiting when the app last closed
+        create_tables()
+        self.queue = AppointmentQueue.from_entries(load_appointments())  # (name, timestamp) per patient
+        self.store = AppointmentWriteBehind(flush_interval=self.FLUSH_INTERVAL_MS / 1000)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # --- UI Frames ---
         top_frame = tk.Frame(root, padx=20, pady=10)
@@ -56,7 +64,10 @@ class AppointmentQueueApp:
         self.log_box = scrolledtext.ScrolledText(log_frame, height=10, bg="#2c3e50", fg="#ecf0f1")
         self.log_box.pack(fill="both", expand=True)
 
+        if len(self.queue):
+            self.log(f"♻️ Restored {len(self.queue)} waiting patients")
         self.update_display()
+        self.root.after(self.FLUSH_INTERVAL_MS, self.flush_changes)
 
     def log(self, message):
         self.log_box.insert(tk.END, message + "\n")
@@ -68,32 +79,52 @@ class AppointmentQueueApp:
             messagebox.showwarning("Input Error", "Please enter a patient name.")
             return
 
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.queue.enqueue(name)
-        self.arrival_order.append((name, timestamp))
+        timestamp = datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.queue.enqueue(name, timestamp)
         self.name_entry.delete(0, tk.END)
 
         self.log(f"✅ Added: {name} at {timestamp}")
+        self.save(self.store.record_enqueue, name, timestamp)
         self.update_display()
 
     def serve_patient(self):
         served = self.queue.dequeue()
         if served:
-            self.arrival_order = [entry for entry in self.arrival_order if entry[0] != served]
             self.log(f"🚑 Served: {served}")
+            self.save(self.store.record_dequeue)
             self.update_display()
         else:
             messagebox.showinfo("Queue Empty", "No patients to serve.")
             self.log("⚠️ Tried to serve, but queue was empty.")
 
+    def save(self, record, *args):
+        # record_* may flush right away; a failed flush keeps the changes
+        # buffered and the next tick retries them
+        try:
+            record(*args)
+        except Exception as e:
+            self.log(f"❌ Could not save queue: {str(e)}")
+
+    def flush_changes(self):
+        self.save(self.store.flush_if_due)
+        self.root.after(self.FLUSH_INTERVAL_MS, self.flush_changes)
+
+    def on_close(self):
+        try:
+            self.store.close()
+        except Exception as e:
+            if not messagebox.askyesno("Save Failed", f"Queue changes could not be saved:\n{str(e)}\n\nClose anyway?"):
+                return
+        self.root.destroy()
+
     def update_display(self):
         self.queue_listbox.delete(0, tk.END)
-        for i, (name, timestamp) in enumerate(self.arrival_order, start=1):
+        for i, (name, timestamp) in enumerate(self.queue, start=1):
             entry = f"{i:>2}. {name:<20} Time: {timestamp}"
             self.queue_listbox.insert(tk.END, entry)
 
     def export_to_csv(self):
-        if not self.arrival_order:
+        if not len(self.queue):
             messagebox.showinfo("No Data", "Queue is empty. Nothing to export.")
             return
 
@@ -107,8 +138,7 @@ class AppointmentQueueApp:
             with open(file_path, mode='w', newline='', encoding='utf-8') as file:
                 writer = csv.writer(file)
                 writer.writerow(["Patient Name", "Timestamp"])
-                for name, timestamp in self.arrival_order:
-                    writer.writerow([name, timestamp])
+                writer.writerows(self.queue)
             self.log(f"📄 Queue exported to: {file_path}")
             messagebox.showinfo("Export Successful", f"Queue saved to:\n{file_path}")
         except Exception as e: